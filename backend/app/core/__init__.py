@@ -1,4 +1,4 @@
 """Core configuration and dependencies."""
-from app.core.config import Settings, get_settings
+from app.core.config import SETTINGS, Settings, get_cors_origins_list, get_settings
 
-__all__ = ["Settings", "get_settings"]
+__all__ = ["SETTINGS", "Settings", "get_cors_origins_list", "get_settings"]
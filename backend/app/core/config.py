@@ -1,12 +1,37 @@
 """Centralised application configuration primitives."""
 from __future__ import annotations
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field, fields
 from functools import lru_cache
-from typing import Tuple
+from typing import Any, List, Optional, Tuple, TypeVar
 
+_T = TypeVar("_T")
 
-@dataclass(frozen=True)
+
+def fast_frozen_dataclass(cls: type[_T]) -> type[_T]:
+    """Build a slotted dataclass that hashes like a frozen one.
+
+    ``frozen=True`` routes every write through a raising ``__setattr__``;
+    here immutability is a convention instead, enforced by constructing the
+    instance only once, as ``SETTINGS``. ``slots=True`` drops the instance
+    ``__dict__``, and the hash is computed once and kept in a private slot.
+    """
+
+    cls.__annotations__["_hash"] = "Optional[int]"
+    setattr(cls, "_hash", field(default=None, init=False, repr=False, compare=False))
+    cls = dataclass(eq=True, slots=True)(cls)
+    compared = tuple(f.name for f in fields(cls) if f.compare)
+
+    def __hash__(self: Any) -> int:
+        if self._hash is None:
+            self._hash = hash(tuple(getattr(self, name) for name in compared))
+        return self._hash
+
+    cls.__hash__ = __hash__  # type: ignore[assignment]
+    return cls
+
+
+@fast_frozen_dataclass
 class Settings:
     """Immutable settings for the backend service."""
 
@@ -21,10 +46,22 @@ class Settings:
         "https://raw.githubusercontent.com/texodus/superstore-arrow/master/superstore.arrow"
     )
     request_timeout_seconds: int = 30
+    data_cache_dir: str = "~/.cache/superstore_insights"
+    data_cache_ttl_seconds: int = 24 * 60 * 60
+    response_max_age_seconds: int = 300
+
+
+SETTINGS: Settings = Settings()
 
 
-@lru_cache
 def get_settings() -> Settings:
-    """Return the memoised settings instance."""
+    """Return the process-wide settings instance."""
+
+    return SETTINGS
+
+
+@lru_cache
+def get_cors_origins_list() -> List[str]:
+    """Return the configured CORS origins as a list, materialised once."""
 
-    return Settings()
+    return list(get_settings().cors_origins)
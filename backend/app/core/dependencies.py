@@ -1,8 +1,12 @@
 """Dependency injection for FastAPI."""
 from functools import lru_cache
+from typing import List, Optional
+
+from fastapi import Query
 
 from app.services.data_service import DataService
 from app.services.chart_service import ChartService
+from app.services.filters import SalesFilters
 
 
 @lru_cache
@@ -15,3 +19,20 @@ def get_data_service() -> DataService:
 def get_chart_service() -> ChartService:
     """Return a singleton ChartService instance."""
     return ChartService(get_data_service())
+
+
+def sales_filters(
+    start_date: Optional[str] = Query(None, description="Start date (YYYY-MM-DD)"),
+    end_date: Optional[str] = Query(None, description="End date (YYYY-MM-DD)"),
+    regions: Optional[List[str]] = Query(None, description="Filter by regions"),
+    segments: Optional[List[str]] = Query(None, description="Filter by segments"),
+    categories: Optional[List[str]] = Query(None, description="Filter by categories"),
+) -> SalesFilters:
+    """Parse the shared filter query parameters once per request."""
+    return SalesFilters.from_query(
+        start_date=start_date,
+        end_date=end_date,
+        regions=regions,
+        segments=segments,
+        categories=categories,
+    )
@@ -0,0 +1,139 @@
+"""Process-local LRU cache for sales endpoint responses.
+
+Every response is a pure function of the services that produced it, the
+requested filters and the loaded version of the dataset. The filter space
+is small and dashboards repeat the same queries, so identical requests are
+served from memory instead of re-running the pandas aggregations. The
+canonical ``SalesFilters`` object is the cache key, together with the
+content hash of the loaded data. Each process loads the data once; it
+only changes when the repository is refreshed with ``force_refresh``,
+after which ``DataService`` reloads its frame and the new hash misses the
+old entries.
+
+Only the encoded JSON bodies are cached; the payload functions here build
+a fresh payload on each call.
+"""
+from functools import lru_cache
+from typing import Any, Callable, Dict, Hashable, List
+
+import orjson
+
+from app.services.chart_service import ChartService
+from app.services.data_service import DataService
+from app.services.filters import SalesFilters
+
+CACHE_SIZE = 256
+
+# Same options FastAPI's ORJSONResponse renders with
+_ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+# Builds one endpoint's response body from the services and filters
+Payload = Callable[[DataService, ChartService, SalesFilters], Dict[str, Any]]
+
+
+def filter_kwargs(filters: SalesFilters) -> Dict[str, Any]:
+    """Expand canonical filters into service keyword arguments."""
+    return {
+        "start_date": filters.start_date,
+        "end_date": filters.end_date,
+        "regions": filters.regions,
+        "segments": filters.segments,
+        "categories": filters.categories,
+    }
+
+
+def to_columnar(records: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Convert row records to a column header plus value rows.
+
+    Chart payloads repeat the same handful of keys on every row, so sending
+    them once keeps the JSON small and quick to encode.
+    """
+    columns = list(records[0]) if records else []
+    return {
+        "columns": columns,
+        "rows": [[record[c] for c in columns] for record in records],
+    }
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def encoded(version: Hashable, func: Callable[..., Any], *args: Any) -> bytes:
+    """Cached JSON body for ``func(*args)`` at a given data version.
+
+    Repeat requests are answered with the stored bytes, so neither the
+    payload nor its serialisation is rebuilt. Only the bytes are kept; the
+    payload functions below are not cached themselves, so each response is
+    held once. ``version`` keeps bodies from a previous dataset load from
+    being served after a refresh.
+    """
+    return orjson.dumps(func(*args), option=_ORJSON_OPTIONS)
+
+
+def overview(
+    data_service: DataService, chart_service: ChartService, filters: SalesFilters
+) -> Dict[str, Any]:
+    """Get overall sales metrics with optional filters."""
+    return data_service.get_overview_metrics(**filter_kwargs(filters))
+
+
+def chart_payload(getter: str, builder: str, description: str) -> Payload:
+    """Build the payload function for one chart: its columnar data plus the figure.
+
+    ``getter`` names the ``DataService`` method returning the records and
+    ``builder`` the ``ChartService`` method drawing them.
+    """
+
+    def payload(
+        data_service: DataService, chart_service: ChartService, filters: SalesFilters
+    ) -> Dict[str, Any]:
+        data = getattr(data_service, getter)(**filter_kwargs(filters))
+        return {**to_columnar(data), "chart": getattr(chart_service, builder)(data)}
+
+    payload.__doc__ = description
+    return payload
+
+
+def dashboard(
+    data_service: DataService, chart_service: ChartService, filters: SalesFilters
+) -> Dict[str, Any]:
+    """Get the overview and every chart in one response with optional filters."""
+    aggregates = data_service.get_dashboard(**filter_kwargs(filters))
+    charts = chart_service.build_dashboard(aggregates)
+    return {
+        "overview": aggregates["overview"],
+        **{
+            name: {**to_columnar(aggregates[name]), "chart": chart}
+            for name, chart in charts.items()
+        },
+    }
+
+
+# Sales endpoint path -> payload function; each is served by one shared route
+# handler, with the function's docstring as the endpoint description.
+PAYLOADS: Dict[str, Payload] = {
+    "overview": overview,
+    "by-category": chart_payload(
+        "get_sales_by_category", "create_category_chart",
+        "Get sales data grouped by category with optional filters.",
+    ),
+    "by-region": chart_payload(
+        "get_sales_by_region", "create_region_chart",
+        "Get sales data grouped by region with optional filters.",
+    ),
+    "trends": chart_payload(
+        "get_sales_trends", "create_trends_chart",
+        "Get sales trends over time with optional filters.",
+    ),
+    "profit-analysis": chart_payload(
+        "get_profit_analysis", "create_profit_chart",
+        "Get profit analysis by category and sub-category with optional filters.",
+    ),
+    "segment-analysis": chart_payload(
+        "get_segment_analysis", "create_segment_chart",
+        "Get sales analysis by customer segment with optional filters.",
+    ),
+    "geo-sales": chart_payload(
+        "get_state_sales", "create_choropleth_map",
+        "Get geographic sales distribution by US state.",
+    ),
+    "dashboard": dashboard,
+}
@@ -1,48 +1,147 @@
 """FastAPI main application module."""
+import asyncio
 import logging
+import queue
+from contextlib import asynccontextmanager, contextmanager
+from logging.handlers import QueueHandler, QueueListener
+from typing import Iterator
+
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 
-from app.core.config import get_settings
+from app.core.config import get_cors_origins_list, get_settings
+from app.core.dependencies import get_chart_service, get_data_service
 from app.routers import health_router, sales_router
+from app.services.repository import DataLoadError, DataValidationError
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
-)
 logger = logging.getLogger(__name__)
 
+# Records beyond this many waiting to be written are dropped rather than
+# letting a stalled stderr grow the queue without limit.
+LOG_QUEUE_SIZE = 10_000
+
+
+class _DroppingQueueHandler(QueueHandler):
+    """Queue handler that drops records while the queue is full."""
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            pass
+
+
+class _BoundedQueueListener(QueueListener):
+    """Queue listener whose stop waits for room for the sentinel in a full queue."""
+
+    def enqueue_sentinel(self) -> None:
+        self.queue.put(self._sentinel)
+
+
+@contextmanager
+def queued_logging() -> Iterator[None]:
+    """Write log records to stderr from a background thread while active.
+
+    Records are queued by the logging call and formatted and written by a
+    listener thread, so request handlers never wait on stderr. The root
+    logger's handlers and level are restored on exit.
+    """
+    log_queue: "queue.Queue[logging.LogRecord]" = queue.Queue(LOG_QUEUE_SIZE)
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(
+        logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+    )
+    listener = _BoundedQueueListener(log_queue, stream_handler)
+    root_logger = logging.getLogger()
+    previous_handlers, previous_level = root_logger.handlers[:], root_logger.level
+    listener.start()
+    try:
+        root_logger.handlers = [_DroppingQueueHandler(log_queue)]
+        root_logger.setLevel(logging.INFO)
+        yield
+    finally:
+        root_logger.handlers = previous_handlers
+        root_logger.setLevel(previous_level)
+        listener.stop()
+
+
 settings = get_settings()
+_INCLUDE_DETAIL = settings.api_version == "dev"
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Load the dataset before the server starts accepting traffic."""
+    with queued_logging():
+        loop = asyncio.get_running_loop()
+        data_service = get_data_service()
+        get_chart_service()
+        try:
+            # Load on the executor so the download and parse never block the loop
+            await loop.run_in_executor(None, lambda: data_service.df)
+        except (DataLoadError, DataValidationError) as e:
+            # Keep serving; requests retry the load and report 503 until it succeeds.
+            logger.warning("Startup data preload failed: %s", e)
+        yield
+
 
 app = FastAPI(
     title=settings.api_title,
     description=settings.api_description,
     version=settings.api_version,
+    lifespan=lifespan,
 )
 
+
+def service_error_handler(status_code: int, error: str, code: str):
+    """Build an exception handler mapping a service error to an HTTP error."""
+
+    async def handler(request: Request, exc: Exception) -> JSONResponse:
+        logger.error("Error on %s: %s", request.url.path, exc, exc_info=True)
+        return JSONResponse(
+            status_code=status_code,
+            content={"detail": {"error": error, "message": str(exc), "code": code}},
+        )
+
+    return handler
+
+
+app.add_exception_handler(
+    DataLoadError,
+    service_error_handler(503, "Data Source Unavailable", "DATA_LOAD_ERROR"),
+)
+app.add_exception_handler(
+    DataValidationError,
+    service_error_handler(500, "Data Validation Failed", "DATA_VALIDATION_ERROR"),
+)
+app.add_exception_handler(
+    ValueError,
+    service_error_handler(400, "Invalid Request", "INVALID_REQUEST"),
+)
+
+
 # Global exception handler for unhandled errors
 @app.exception_handler(Exception)
 async def global_exception_handler(request: Request, exc: Exception):
     """Handle any unhandled exceptions gracefully."""
-    logger.error(f"Unhandled error on {request.url.path}: {exc}", exc_info=True)
+    logger.error("Unhandled error on %s: %s", request.url.path, exc, exc_info=True)
     return JSONResponse(
         status_code=500,
         content={
             "error": "Internal Server Error",
             "message": "An unexpected error occurred. Please try again later.",
-            "detail": str(exc) if settings.api_version == "dev" else None,
+            "detail": str(exc) if _INCLUDE_DETAIL else None,
         }
     )
 
 # CORS middleware
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=list(settings.cors_origins),
+    allow_origins=get_cors_origins_list(),
     allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+    allow_methods=["GET"],
+    allow_headers=["Authorization", "Content-Type"],
 )
 
 # Include routers
@@ -1,10 +1,13 @@
 """Health check endpoint."""
-from fastapi import APIRouter
+from fastapi import APIRouter, Response
 
 router = APIRouter(tags=["health"])
 
+# Probes hit this constantly; encode the body once instead of per request.
+_HEALTH_BODY = b'{"status":"healthy","message":"Superstore Insights API is running"}'
+
 
 @router.get("/health")
-async def health_check() -> dict:
+async def health_check():
     """Health check endpoint."""
-    return {"status": "healthy", "message": "Superstore Insights API is running"}
+    return Response(content=_HEALTH_BODY, media_type="application/json")
@@ -1,239 +1,159 @@
 """Sales API routes."""
-import logging
-from typing import List, Optional
-
-from fastapi import APIRouter, Depends, HTTPException, Query
-
-from app.core.dependencies import get_chart_service, get_data_service
+import asyncio
+import hashlib
+from functools import partial
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Hashable, Optional, TypeVar
+
+import orjson
+from fastapi import APIRouter, Depends, Request, Response
+from fastapi.responses import ORJSONResponse, StreamingResponse
+
+from app.core import response_cache
+from app.core.config import get_settings
+from app.core.dependencies import get_chart_service, get_data_service, sales_filters
 from app.services.chart_service import ChartService
 from app.services.data_service import DataService
-from app.services.repository import DataLoadError, DataValidationError
+from app.services.filters import SalesFilters
 
-logger = logging.getLogger(__name__)
+router = APIRouter(
+    prefix="/sales",
+    tags=["sales"],
+    default_response_class=ORJSONResponse,
+)
 
-router = APIRouter(prefix="/sales", tags=["sales"])
+_T = TypeVar("_T")
 
 
-def handle_service_error(e: Exception, operation: str) -> HTTPException:
-    """Convert service exceptions to appropriate HTTP errors."""
-    logger.error(f"Error in {operation}: {e}", exc_info=True)
-    
-    if isinstance(e, DataLoadError):
-        return HTTPException(
-            status_code=503,
-            detail={
-                "error": "Data Source Unavailable",
-                "message": str(e),
-                "code": "DATA_LOAD_ERROR"
-            }
-        )
-    elif isinstance(e, DataValidationError):
-        return HTTPException(
-            status_code=500,
-            detail={
-                "error": "Data Validation Failed",
-                "message": str(e),
-                "code": "DATA_VALIDATION_ERROR"
-            }
-        )
-    elif isinstance(e, ValueError):
-        return HTTPException(
-            status_code=400,
-            detail={
-                "error": "Invalid Request",
-                "message": str(e),
-                "code": "INVALID_REQUEST"
-            }
-        )
-    else:
-        return HTTPException(
-            status_code=500,
-            detail={
-                "error": "Internal Server Error",
-                "message": "An unexpected error occurred. Please try again later.",
-                "code": "INTERNAL_ERROR"
-            }
-        )
+_CACHE_CONTROL = f"public, max-age={get_settings().response_max_age_seconds}"
+
+
+async def run_blocking(func: Callable[..., _T], *args: Any) -> _T:
+    """Run CPU-bound pandas work off the event loop."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(None, partial(func, *args))
+
+
+def response_etag(request: Request, key: Hashable, data_service: DataService) -> str:
+    """Derive a strong ETag from the endpoint, its filters and the data content.
+
+    The data version is a hash of the loaded file, so every worker, and a
+    restarted process, gives unchanged data the same ETag.
+    """
+    version = f"{request.url.path}|{key!r}|{data_service.data_version}"
+    return '"%s"' % hashlib.blake2b(version.encode(), digest_size=16).hexdigest()
 
 
-@router.get("/filter-options")
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Whether an If-None-Match header matches the ETag.
+
+    Uses the weak comparison RFC 9110 requires for If-None-Match, so ``W/``
+    validators, comma-separated lists and ``*`` are all honoured.
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = (tag.strip() for tag in if_none_match.split(","))
+    return etag in (tag[2:] if tag.startswith("W/") else tag for tag in candidates)
+
+
+async def cacheable_response(
+    request: Request,
+    data_service: DataService,
+    key: Hashable,
+    func: Callable[..., Dict[str, Any]],
+    *args: Any,
+) -> Response:
+    """Serve a payload with HTTP caching headers, or 304 if the client's copy is current.
+
+    The data only changes on reload, so a response is fully determined by the
+    endpoint, its filters and the content of the loaded data.
+    """
+    if data_service.data_version is None:
+        # Load first, so even the first response carries a validator
+        await run_blocking(lambda: data_service.df)
+    version = data_service.data_version
+    etag = response_etag(request, key, data_service)
+    headers = {"ETag": etag, "Cache-Control": _CACHE_CONTROL}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    body = await run_blocking(response_cache.encoded, version, func, *args)
+    return Response(body, media_type="application/json", headers=headers)
+
+
+@router.get("/filter-options", response_model=None)
 async def get_filter_options(
+    request: Request,
     data_service: DataService = Depends(get_data_service),
-) -> dict:
+) -> Response:
     """Get available filter options."""
-    try:
-        return data_service.get_filter_options()
-    except Exception as e:
-        raise handle_service_error(e, "get_filter_options")
-
-
-@router.get("/overview")
-async def get_sales_overview(
-    start_date: Optional[str] = Query(None, description="Start date (YYYY-MM-DD)"),
-    end_date: Optional[str] = Query(None, description="End date (YYYY-MM-DD)"),
-    regions: Optional[List[str]] = Query(None, description="Filter by regions"),
-    segments: Optional[List[str]] = Query(None, description="Filter by segments"),
-    categories: Optional[List[str]] = Query(None, description="Filter by categories"),
-    data_service: DataService = Depends(get_data_service),
-) -> dict:
-    """Get overall sales metrics with optional filters."""
-    try:
-        return data_service.get_overview_metrics(
-            start_date=start_date,
-            end_date=end_date,
-            regions=regions,
-            segments=segments,
-            categories=categories,
+    return await cacheable_response(
+        request, data_service, (), data_service.get_filter_options
+    )
+
+
+def payload_route(payload: response_cache.Payload) -> Callable[..., Awaitable[Response]]:
+    """Build the GET handler serving one payload with HTTP caching."""
+
+    async def handler(
+        request: Request,
+        filters: SalesFilters = Depends(sales_filters),
+        data_service: DataService = Depends(get_data_service),
+        chart_service: ChartService = Depends(get_chart_service),
+    ) -> Response:
+        return await cacheable_response(
+            request, data_service, filters, payload, data_service, chart_service, filters
         )
-    except Exception as e:
-        raise handle_service_error(e, "get_sales_overview")
 
+    return handler
 
-@router.get("/by-category")
-async def get_sales_by_category(
-    start_date: Optional[str] = Query(None, description="Start date (YYYY-MM-DD)"),
-    end_date: Optional[str] = Query(None, description="End date (YYYY-MM-DD)"),
-    regions: Optional[List[str]] = Query(None, description="Filter by regions"),
-    segments: Optional[List[str]] = Query(None, description="Filter by segments"),
-    categories: Optional[List[str]] = Query(None, description="Filter by categories"),
-    data_service: DataService = Depends(get_data_service),
-    chart_service: ChartService = Depends(get_chart_service),
-) -> dict:
-    """Get sales data grouped by category with optional filters."""
-    try:
-        data = data_service.get_sales_by_category(
-            start_date=start_date,
-            end_date=end_date,
-            regions=regions,
-            segments=segments,
-            categories=categories,
-        )
-        chart = chart_service.create_category_chart(data)
-        return {"data": data, "chart": chart}
-    except Exception as e:
-        raise handle_service_error(e, "get_sales_by_category")
-
-
-@router.get("/by-region")
-async def get_sales_by_region(
-    start_date: Optional[str] = Query(None, description="Start date (YYYY-MM-DD)"),
-    end_date: Optional[str] = Query(None, description="End date (YYYY-MM-DD)"),
-    regions: Optional[List[str]] = Query(None, description="Filter by regions"),
-    segments: Optional[List[str]] = Query(None, description="Filter by segments"),
-    categories: Optional[List[str]] = Query(None, description="Filter by categories"),
-    data_service: DataService = Depends(get_data_service),
-    chart_service: ChartService = Depends(get_chart_service),
-) -> dict:
-    """Get sales data grouped by region with optional filters."""
-    try:
-        data = data_service.get_sales_by_region(
-            start_date=start_date,
-            end_date=end_date,
-            regions=regions,
-            segments=segments,
-            categories=categories,
-        )
-        chart = chart_service.create_region_chart(data)
-        return {"data": data, "chart": chart}
-    except Exception as e:
-        raise handle_service_error(e, "get_sales_by_region")
-
-
-@router.get("/trends")
-async def get_sales_trends(
-    start_date: Optional[str] = Query(None, description="Start date (YYYY-MM-DD)"),
-    end_date: Optional[str] = Query(None, description="End date (YYYY-MM-DD)"),
-    regions: Optional[List[str]] = Query(None, description="Filter by regions"),
-    segments: Optional[List[str]] = Query(None, description="Filter by segments"),
-    categories: Optional[List[str]] = Query(None, description="Filter by categories"),
-    data_service: DataService = Depends(get_data_service),
-    chart_service: ChartService = Depends(get_chart_service),
-) -> dict:
-    """Get sales trends over time with optional filters."""
-    try:
-        data = data_service.get_sales_trends(
-            start_date=start_date,
-            end_date=end_date,
-            regions=regions,
-            segments=segments,
-            categories=categories,
-        )
-        chart = chart_service.create_trends_chart(data)
-        return {"data": data, "chart": chart}
-    except Exception as e:
-        raise handle_service_error(e, "get_sales_trends")
-
-
-@router.get("/profit-analysis")
-async def get_profit_analysis(
-    start_date: Optional[str] = Query(None, description="Start date (YYYY-MM-DD)"),
-    end_date: Optional[str] = Query(None, description="End date (YYYY-MM-DD)"),
-    regions: Optional[List[str]] = Query(None, description="Filter by regions"),
-    segments: Optional[List[str]] = Query(None, description="Filter by segments"),
-    categories: Optional[List[str]] = Query(None, description="Filter by categories"),
-    data_service: DataService = Depends(get_data_service),
-    chart_service: ChartService = Depends(get_chart_service),
-) -> dict:
-    """Get profit analysis by category and sub-category with optional filters."""
-    try:
-        data = data_service.get_profit_analysis(
-            start_date=start_date,
-            end_date=end_date,
-            regions=regions,
-            segments=segments,
-            categories=categories,
-        )
-        chart = chart_service.create_profit_chart(data)
-        return {"data": data, "chart": chart}
-    except Exception as e:
-        raise handle_service_error(e, "get_profit_analysis")
-
-
-@router.get("/segment-analysis")
-async def get_segment_analysis(
-    start_date: Optional[str] = Query(None, description="Start date (YYYY-MM-DD)"),
-    end_date: Optional[str] = Query(None, description="End date (YYYY-MM-DD)"),
-    regions: Optional[List[str]] = Query(None, description="Filter by regions"),
-    segments: Optional[List[str]] = Query(None, description="Filter by segments"),
-    categories: Optional[List[str]] = Query(None, description="Filter by categories"),
-    data_service: DataService = Depends(get_data_service),
-    chart_service: ChartService = Depends(get_chart_service),
-) -> dict:
-    """Get sales analysis by customer segment with optional filters."""
-    try:
-        data = data_service.get_segment_analysis(
-            start_date=start_date,
-            end_date=end_date,
-            regions=regions,
-            segments=segments,
-            categories=categories,
-        )
-        chart = chart_service.create_segment_chart(data)
-        return {"data": data, "chart": chart}
-    except Exception as e:
-        raise handle_service_error(e, "get_segment_analysis")
-
-
-@router.get("/geo-sales")
-async def get_geo_sales(
-    start_date: Optional[str] = Query(None, description="Start date (YYYY-MM-DD)"),
-    end_date: Optional[str] = Query(None, description="End date (YYYY-MM-DD)"),
-    regions: Optional[List[str]] = Query(None, description="Filter by regions"),
-    segments: Optional[List[str]] = Query(None, description="Filter by segments"),
-    categories: Optional[List[str]] = Query(None, description="Filter by categories"),
+
+for path, payload in response_cache.PAYLOADS.items():
+    router.add_api_route(
+        f"/{path}",
+        payload_route(payload),
+        methods=["GET"],
+        response_model=None,
+        name=f"get_{path.replace('-', '_')}",
+        description=payload.__doc__,
+    )
+
+
+async def stream_dashboard_charts(
+    aggregates: Dict[str, Any], chart_service: ChartService
+) -> AsyncIterator[bytes]:
+    """Yield each dashboard chart as an NDJSON line as soon as it is built."""
+    loop = asyncio.get_running_loop()
+
+    async def build(name: str, method: str) -> Dict[str, Any]:
+        records = aggregates[name]
+        chart = await loop.run_in_executor(None, getattr(chart_service, method), records)
+        return {"key": name, **response_cache.to_columnar(records), "chart": chart}
+
+    tasks = [build(name, method) for name, method in ChartService.DASHBOARD_CHARTS.items()]
+    for next_chart in asyncio.as_completed(tasks):
+        yield orjson.dumps(await next_chart) + b"\n"
+
+
+@router.get("/dashboard/stream", response_model=None)
+async def stream_dashboard(
+    filters: SalesFilters = Depends(sales_filters),
     data_service: DataService = Depends(get_data_service),
     chart_service: ChartService = Depends(get_chart_service),
-) -> dict:
-    """Get geographic sales distribution by US state."""
-    try:
-        data = data_service.get_state_sales(
-            start_date=start_date,
-            end_date=end_date,
-            regions=regions,
-            segments=segments,
-            categories=categories,
-        )
-        chart = chart_service.create_choropleth_map(data)
-        return {"data": data, "chart": chart}
-    except Exception as e:
-        raise handle_service_error(e, "get_geo_sales")
+) -> StreamingResponse:
+    """Stream the overview, then each chart as it is ready, as NDJSON lines.
+
+    Aggregation runs before the response starts, so data errors still map to
+    the usual error responses. Each line is ``{"key": ..., ...}``; charts
+    arrive in completion order.
+    """
+    aggregates = await run_blocking(
+        partial(data_service.get_dashboard, **response_cache.filter_kwargs(filters))
+    )
+
+    async def lines() -> AsyncIterator[bytes]:
+        yield orjson.dumps({"key": "overview", **aggregates["overview"]}) + b"\n"
+        async for line in stream_dashboard_charts(aggregates, chart_service):
+            yield line
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
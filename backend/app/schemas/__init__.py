@@ -2,6 +2,7 @@
 from app.schemas.responses import (
     CategoryData,
     ChartResponse,
+    DashboardResponse,
     DateRange,
     FilterOptions,
     HealthResponse,
@@ -15,6 +16,7 @@ from app.schemas.responses import (
 __all__ = [
     "CategoryData",
     "ChartResponse",
+    "DashboardResponse",
     "DateRange",
     "FilterOptions",
     "HealthResponse",
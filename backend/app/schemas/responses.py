@@ -1,17 +1,23 @@
 """Pydantic response models for the API."""
 from typing import Any, Dict, List
 
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 
 
-class HealthResponse(BaseModel):
+class ResponseModel(BaseModel):
+    """Base for read-only response payloads."""
+
+    model_config = ConfigDict(frozen=True)
+
+
+class HealthResponse(ResponseModel):
     """Health check response."""
 
     status: str
     message: str
 
 
-class OverviewMetrics(BaseModel):
+class OverviewMetrics(ResponseModel):
     """Overview metrics response."""
 
     total_sales: float
@@ -22,7 +28,7 @@ class OverviewMetrics(BaseModel):
     profit_margin: float
 
 
-class CategoryData(BaseModel):
+class CategoryData(ResponseModel):
     """Category sales data."""
 
     category: str
@@ -32,7 +38,7 @@ class CategoryData(BaseModel):
     orders: int
 
 
-class RegionData(BaseModel):
+class RegionData(ResponseModel):
     """Region sales data."""
 
     region: str
@@ -42,7 +48,7 @@ class RegionData(BaseModel):
     orders: int
 
 
-class TrendData(BaseModel):
+class TrendData(ResponseModel):
     """Monthly trend data."""
 
     month: str
@@ -51,7 +57,7 @@ class TrendData(BaseModel):
     orders: int
 
 
-class ProfitData(BaseModel):
+class ProfitData(ResponseModel):
     """Profit analysis data."""
 
     category: str
@@ -62,7 +68,7 @@ class ProfitData(BaseModel):
     profit_margin: float
 
 
-class SegmentData(BaseModel):
+class SegmentData(ResponseModel):
     """Segment analysis data."""
 
     segment: str
@@ -72,21 +78,34 @@ class SegmentData(BaseModel):
     orders: int
 
 
-class ChartResponse(BaseModel):
-    """Response with data and chart configuration."""
+class ChartResponse(ResponseModel):
+    """Response with columnar data and chart configuration."""
 
-    data: List[Dict[str, Any]]
+    columns: List[str]
+    rows: List[List[Any]]
     chart: Dict[str, Any]
 
 
-class DateRange(BaseModel):
+class DashboardResponse(ResponseModel):
+    """Overview metrics plus every chart, from one request."""
+
+    overview: OverviewMetrics
+    category: ChartResponse
+    region: ChartResponse
+    trends: ChartResponse
+    profit: ChartResponse
+    segment: ChartResponse
+    states: ChartResponse
+
+
+class DateRange(ResponseModel):
     """Date range for filter options."""
 
     min: str
     max: str
 
 
-class FilterOptions(BaseModel):
+class FilterOptions(ResponseModel):
     """Available filter options."""
 
     regions: List[str]
@@ -1,7 +1,186 @@
 """Analytics functions for computing sales metrics."""
-from typing import Any, Dict, List
+from concurrent.futures import Executor
+from functools import reduce
+from typing import Any, Dict, List, Optional, Tuple, Union
 
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+# State name to abbreviation mapping for the choropleth map
+STATE_ABBREVIATIONS = {
+    "Alabama": "AL", "Alaska": "AK", "Arizona": "AZ", "Arkansas": "AR",
+    "California": "CA", "Colorado": "CO", "Connecticut": "CT", "Delaware": "DE",
+    "Florida": "FL", "Georgia": "GA", "Hawaii": "HI", "Idaho": "ID",
+    "Illinois": "IL", "Indiana": "IN", "Iowa": "IA", "Kansas": "KS",
+    "Kentucky": "KY", "Louisiana": "LA", "Maine": "ME", "Maryland": "MD",
+    "Massachusetts": "MA", "Michigan": "MI", "Minnesota": "MN", "Mississippi": "MS",
+    "Missouri": "MO", "Montana": "MT", "Nebraska": "NE", "Nevada": "NV",
+    "New Hampshire": "NH", "New Jersey": "NJ", "New Mexico": "NM", "New York": "NY",
+    "North Carolina": "NC", "North Dakota": "ND", "Ohio": "OH", "Oklahoma": "OK",
+    "Oregon": "OR", "Pennsylvania": "PA", "Rhode Island": "RI", "South Carolina": "SC",
+    "South Dakota": "SD", "Tennessee": "TN", "Texas": "TX", "Utah": "UT",
+    "Vermont": "VT", "Virginia": "VA", "Washington": "WA", "West Virginia": "WV",
+    "Wisconsin": "WI", "Wyoming": "WY", "District of Columbia": "DC",
+}
+
+# Order month labels, added as a categorical column when the data is loaded
+MONTH_COLUMN = "Order Month"
+
+# Series.map converts a dict argument to a Series on every call; build it once.
+_STATE_CODES = pd.Series(STATE_ABBREVIATIONS)
+
+
+# Aggregations the Arrow path supports, mapped to Arrow's function names
+_ARROW_AGGREGATIONS = {"sum": "sum", "nunique": "count_distinct"}
+
+
+def _aggregate(df: pd.DataFrame, by: Union[str, List[str], pd.Series], **aggregations) -> pd.DataFrame:
+    """Group by key(s) and compute named aggregations in one pass.
+
+    When every key is categorical, the category codes are grouped with
+    Arrow's hash aggregation (see ``_aggregate_arrow``). Otherwise pandas
+    groups the frame, running each aggregation function as a single kernel
+    over all of its source columns; this skips the per-column dispatch and
+    concatenation of ``DataFrameGroupBy.agg`` with named aggregations, which
+    costs more than the kernels themselves on this data.
+
+    Args:
+        df: Filtered sales dataframe
+        by: Column name(s) or a key Series aligned with df to group by
+        **aggregations: output_name=(source_column, aggfunc) pairs
+
+    Returns:
+        Grouped dataframe with the key(s) as regular columns, sorted by key
+    """
+    keys = [by] if isinstance(by, (str, pd.Series)) else by
+    key_series = [df[key] if isinstance(key, str) else key for key in keys]
+    if all(isinstance(key.dtype, pd.CategoricalDtype) for key in key_series) and all(
+        func in _ARROW_AGGREGATIONS for _, func in aggregations.values()
+    ):
+        return _aggregate_arrow(df, key_series, aggregations)
+
+    # Categorical keys keep every category after filtering; skip empty groups.
+    # as_index=False drops keys that are not columns of df, so a key Series
+    # is grouped into the index and reset afterwards.
+    as_index = isinstance(by, pd.Series)
+    grouped = df.groupby(by, as_index=as_index, observed=True)
+    sources_by_func: Dict[str, List[str]] = {}
+    for source, func in aggregations.values():
+        sources_by_func.setdefault(func, []).append(source)
+    results = {
+        func: getattr(grouped[list(dict.fromkeys(sources))], func)()
+        for func, sources in sources_by_func.items()
+    }
+    columns = {name: results[func][source] for name, (source, func) in aggregations.items()}
+    if as_index:
+        return pd.DataFrame(columns).reset_index()
+    # Every result lists the groups in the same order, each with the keys
+    first = next(iter(results.values()))
+    return pd.DataFrame({**{key: first[key] for key in keys}, **columns})
+
+
+def _arrow_column(values: pd.Series) -> pa.Array:
+    """Arrow view of a column; categoricals become their codes, missing as null."""
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        codes = values.cat.codes.to_numpy()
+        return pa.array(codes, mask=codes < 0)
+    return pa.array(values, from_pandas=True)
+
+
+def _aggregate_arrow(
+    df: pd.DataFrame, keys: List[pd.Series], aggregations: Dict[str, Tuple[str, str]]
+) -> pd.DataFrame:
+    """Aggregate by categorical keys with Arrow's multithreaded group_by.
+
+    Only integer codes and numeric buffers are handed to Arrow, so building
+    the table is close to free, and grouping by codes sorted ascending gives
+    the same groups and order as ``groupby(observed=True)``. Rows with a
+    missing key are dropped, as pandas does.
+
+    Float sums are left to pandas, grouped by the same codes: Arrow adds
+    the values in a different order, which moves rounded totals by a cent.
+    """
+    names = [key.name for key in keys]
+    columns = {name: _arrow_column(key) for name, key in zip(names, keys)}
+    float_sums = list(dict.fromkeys(
+        source for source, func in aggregations.values()
+        if func == "sum" and df[source].dtype.kind == "f"
+    ))
+    for source, func in aggregations.values():
+        if source not in columns and source not in float_sums:
+            columns[source] = _arrow_column(df[source])
+    table = pa.table(columns)
+    if any(table[name].null_count for name in names):
+        table = table.filter(reduce(pc.and_, [pc.is_valid(table[name]) for name in names]))
+
+    targets = list(dict.fromkeys(
+        (source, _ARROW_AGGREGATIONS[func]) for source, func in aggregations.values()
+        if source not in float_sums
+    ))
+    grouped = table.group_by(names).aggregate(targets)
+    grouped = grouped.sort_by([(name, "ascending") for name in names])
+
+    result = {
+        name: pd.Categorical.from_codes(grouped[name].to_numpy(), dtype=key.dtype)
+        for name, key in zip(names, keys)
+    }
+    sums = _float_sums(df, keys, float_sums) if float_sums else None
+    for name, (source, func) in aggregations.items():
+        if source in float_sums:
+            result[name] = sums[source].to_numpy()
+        else:
+            result[name] = grouped[f"{source}_{_ARROW_AGGREGATIONS[func]}"].to_numpy()
+    return pd.DataFrame(result)
+
+
+def _float_sums(df: pd.DataFrame, keys: List[pd.Series], sources: List[str]) -> pd.DataFrame:
+    """Per-group sums with pandas' compensated summation, ordered by key codes."""
+    codes = [key.cat.codes.to_numpy() for key in keys]
+    valid = reduce(np.logical_and, [c >= 0 for c in codes])
+    values = pd.DataFrame({source: df[source].to_numpy()[valid] for source in sources})
+    return values.groupby([c[valid] for c in codes], sort=True).sum()
+
+
+def _code_counts(values: pd.Series) -> np.ndarray:
+    """Rows per category of a categorical column, missing values excluded."""
+    codes = values.cat.codes.to_numpy()
+    return np.bincount(codes[codes >= 0], minlength=len(values.cat.categories))
+
+
+def _count_distinct(values: pd.Series) -> int:
+    """Count distinct non-null values, using category codes when available."""
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        return int(np.count_nonzero(_code_counts(values)))
+    return int(values.nunique())
+
+
+def _sorted_distinct(values: pd.Series) -> List[Any]:
+    """Sorted distinct non-null values, read off the categories when available."""
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        return sorted(values.cat.categories[_code_counts(values) > 0].tolist())
+    return sorted(values.dropna().unique().tolist())
+
+
+def _to_records(grouped: pd.DataFrame) -> List[Dict[str, Any]]:
+    """Convert a small aggregate frame to records of native Python values.
+
+    Each column is converted with ``tolist`` once and the rows are zipped
+    back together, which avoids ``to_dict("records")`` boxing every cell
+    individually.
+    """
+    columns = list(grouped.columns)
+    values = [grouped[col].tolist() for col in columns]
+    return [dict(zip(columns, row)) for row in zip(*values)]
+
+
+def _margins(sales: np.ndarray, profit: np.ndarray) -> np.ndarray:
+    """Profit margin percentages, zero where there are no sales."""
+    out = np.zeros(sales.shape, dtype=np.float64)
+    np.divide(profit, sales, out=out, where=sales != 0)
+    out *= 100
+    return out
 
 
 def compute_overview_metrics(df: pd.DataFrame) -> Dict[str, Any]:
@@ -13,15 +192,15 @@ def compute_overview_metrics(df: pd.DataFrame) -> Dict[str, Any]:
     Returns:
         Dictionary with overview metrics
     """
-    total_sales = float(df["Sales"].sum())
-    total_profit = float(df["Profit"].sum())
-    unique_orders = df["Order ID"].nunique()
+    total_sales = float(df["Sales"].to_numpy().sum())
+    total_profit = float(df["Profit"].to_numpy().sum())
+    unique_orders = _count_distinct(df["Order ID"])
     
     return {
         "total_sales": round(total_sales, 2),
         "total_profit": round(total_profit, 2),
-        "total_orders": int(unique_orders),
-        "total_customers": int(df["Customer ID"].nunique()),
+        "total_orders": unique_orders,
+        "total_customers": _count_distinct(df["Customer ID"]),
         "avg_order_value": round(total_sales / unique_orders, 2) if unique_orders > 0 else 0.0,
         "profit_margin": round(total_profit / total_sales * 100, 2) if total_sales > 0 else 0.0,
     }
@@ -36,15 +215,15 @@ def compute_sales_by_category(df: pd.DataFrame) -> List[Dict[str, Any]]:
     Returns:
         List of category sales records
     """
-    grouped = df.groupby("Category").agg({
-        "Sales": "sum",
-        "Profit": "sum",
-        "Quantity": "sum",
-        "Order ID": "nunique",
-    }).reset_index()
-    grouped.columns = ["category", "sales", "profit", "quantity", "orders"]
+    grouped = _aggregate(
+        df, "Category",
+        sales=("Sales", "sum"),
+        profit=("Profit", "sum"),
+        quantity=("Quantity", "sum"),
+        orders=("Order ID", "nunique"),
+    ).rename(columns={"Category": "category"})
     grouped = grouped.round({"sales": 2, "profit": 2})
-    return grouped.to_dict("records")
+    return _to_records(grouped)
 
 
 def compute_sales_by_region(df: pd.DataFrame) -> List[Dict[str, Any]]:
@@ -56,37 +235,66 @@ def compute_sales_by_region(df: pd.DataFrame) -> List[Dict[str, Any]]:
     Returns:
         List of region sales records
     """
-    grouped = df.groupby("Region").agg({
-        "Sales": "sum",
-        "Profit": "sum",
-        "Quantity": "sum",
-        "Order ID": "nunique",
-    }).reset_index()
-    grouped.columns = ["region", "sales", "profit", "quantity", "orders"]
+    grouped = _aggregate(
+        df, "Region",
+        sales=("Sales", "sum"),
+        profit=("Profit", "sum"),
+        quantity=("Quantity", "sum"),
+        orders=("Order ID", "nunique"),
+    ).rename(columns={"Region": "region"})
     grouped = grouped.round({"sales": 2, "profit": 2})
-    return grouped.to_dict("records")
+    return _to_records(grouped)
+
+
+def order_months(order_dates: pd.Series) -> pd.Series:
+    """Label each order date with its month as a "YYYY-MM" categorical.
+
+    Dates are truncated to numpy ``datetime64[M]`` and the month offset
+    from the earliest one is used directly as the category code, so no
+    Period objects are built and no hashing or sorting is needed. The
+    categories are every month in the range, in chronological order, which
+    is also their lexicographic order; missing dates get no month.
+    """
+    months = order_dates.to_numpy().astype("datetime64[M]")
+    missing = np.isnat(months)
+    present = months[~missing]
+    if present.size:
+        first = present.min()
+        span = np.arange(first, present.max() + np.timedelta64(1, "M"), dtype="datetime64[M]")
+        codes = (months - first).astype(np.int64)
+    else:
+        span = np.array([], dtype="datetime64[M]")
+        codes = np.zeros(len(months), dtype=np.int64)
+    codes[missing] = -1
+    labels = pd.DatetimeIndex(span).strftime("%Y-%m")
+    return pd.Series(
+        pd.Categorical.from_codes(codes, categories=labels),
+        index=order_dates.index,
+        name=MONTH_COLUMN,
+    )
 
 
 def compute_sales_trends(df: pd.DataFrame) -> List[Dict[str, Any]]:
     """Compute monthly sales trends.
     
+    Uses the precomputed month column when the dataframe has one (see
+    ``DataRepository``); otherwise months are derived from the order dates.
+
     Args:
         df: Filtered sales dataframe
         
     Returns:
         List of monthly trend records
     """
-    df_copy = df.copy()
-    df_copy["Month"] = df_copy["Order Date"].dt.to_period("M")
-    grouped = df_copy.groupby("Month").agg({
-        "Sales": "sum",
-        "Profit": "sum",
-        "Order ID": "nunique",
-    }).reset_index()
-    grouped["Month"] = grouped["Month"].astype(str)
-    grouped.columns = ["month", "sales", "profit", "orders"]
+    month = df[MONTH_COLUMN] if MONTH_COLUMN in df.columns else order_months(df["Order Date"])
+    grouped = _aggregate(
+        df, month,
+        sales=("Sales", "sum"),
+        profit=("Profit", "sum"),
+        orders=("Order ID", "nunique"),
+    ).rename(columns={MONTH_COLUMN: "month"})
     grouped = grouped.round({"sales": 2, "profit": 2})
-    return grouped.to_dict("records")
+    return _to_records(grouped)
 
 
 def compute_profit_analysis(df: pd.DataFrame) -> List[Dict[str, Any]]:
@@ -96,30 +304,19 @@ def compute_profit_analysis(df: pd.DataFrame) -> List[Dict[str, Any]]:
         df: Filtered sales dataframe
         
     Returns:
-        List of profit analysis records
+        List of profit analysis records, least profitable first
     """
-    grouped = df.groupby(["Category", "Sub-Category"]).agg({
-        "Sales": "sum",
-        "Profit": "sum",
-        "Quantity": "sum",
-    }).reset_index()
-    
-    records = []
-    for _, row in grouped.iterrows():
-        sales = row["Sales"]
-        profit = row["Profit"]
-        margin = round((profit / sales * 100), 2) if sales != 0 else 0.0
-        
-        records.append({
-            "category": str(row["Category"]),
-            "sub_category": str(row["Sub-Category"]),
-            "sales": round(sales, 2),
-            "profit": round(profit, 2),
-            "quantity": int(row["Quantity"]),
-            "profit_margin": margin,
-        })
-    
-    return records
+    grouped = _aggregate(
+        df, ["Category", "Sub-Category"],
+        sales=("Sales", "sum"),
+        profit=("Profit", "sum"),
+        quantity=("Quantity", "sum"),
+    ).rename(columns={"Category": "category", "Sub-Category": "sub_category"})
+    grouped["profit_margin"] = _margins(grouped["sales"].to_numpy(), grouped["profit"].to_numpy())
+    grouped = grouped.round({"sales": 2, "profit": 2, "profit_margin": 2})
+    grouped = grouped.astype({"category": str, "sub_category": str})
+    grouped = grouped.sort_values("profit", kind="stable")
+    return _to_records(grouped)
 
 
 def compute_segment_analysis(df: pd.DataFrame) -> List[Dict[str, Any]]:
@@ -131,15 +328,46 @@ def compute_segment_analysis(df: pd.DataFrame) -> List[Dict[str, Any]]:
     Returns:
         List of segment analysis records
     """
-    grouped = df.groupby("Segment").agg({
-        "Sales": "sum",
-        "Profit": "sum",
-        "Customer ID": "nunique",
-        "Order ID": "nunique",
-    }).reset_index()
-    grouped.columns = ["segment", "sales", "profit", "customers", "orders"]
+    grouped = _aggregate(
+        df, "Segment",
+        sales=("Sales", "sum"),
+        profit=("Profit", "sum"),
+        customers=("Customer ID", "nunique"),
+        orders=("Order ID", "nunique"),
+    ).rename(columns={"Segment": "segment"})
     grouped = grouped.round({"sales": 2, "profit": 2})
-    return grouped.to_dict("records")
+    return _to_records(grouped)
+
+
+def compute_dashboard(
+    df: pd.DataFrame, executor: Optional[Executor] = None
+) -> Dict[str, Any]:
+    """Compute every dashboard aggregate from one filtered dataframe.
+
+    The aggregates are independent and pandas releases the GIL inside its
+    groupby kernels, so with an executor they run concurrently. ``df`` is
+    only read, never modified.
+
+    Args:
+        df: Filtered sales dataframe
+        executor: Optional executor to run the aggregates on
+
+    Returns:
+        Dictionary with the overview metrics and each breakdown's records
+    """
+    tasks = {
+        "overview": compute_overview_metrics,
+        "category": compute_sales_by_category,
+        "region": compute_sales_by_region,
+        "segment": compute_segment_analysis,
+        "trends": compute_sales_trends,
+        "profit": compute_profit_analysis,
+        "states": compute_state_sales,
+    }
+    if executor is None:
+        return {name: func(df) for name, func in tasks.items()}
+    futures = {name: executor.submit(func, df) for name, func in tasks.items()}
+    return {name: future.result() for name, future in futures.items()}
 
 
 def compute_filter_options(df: pd.DataFrame) -> Dict[str, Any]:
@@ -152,9 +380,9 @@ def compute_filter_options(df: pd.DataFrame) -> Dict[str, Any]:
         Dictionary with filter options
     """
     return {
-        "regions": sorted(df["Region"].unique().tolist()),
-        "segments": sorted(df["Segment"].unique().tolist()),
-        "categories": sorted(df["Category"].unique().tolist()),
+        "regions": _sorted_distinct(df["Region"]),
+        "segments": _sorted_distinct(df["Segment"]),
+        "categories": _sorted_distinct(df["Category"]),
         "date_range": {
             "min": df["Order Date"].min().strftime("%Y-%m-%d"),
             "max": df["Order Date"].max().strftime("%Y-%m-%d"),
@@ -171,40 +399,14 @@ def compute_state_sales(df: pd.DataFrame) -> List[Dict[str, Any]]:
     Returns:
         List of state sales records with state codes
     """
-    # State name to abbreviation mapping
-    state_abbrev = {
-        "Alabama": "AL", "Alaska": "AK", "Arizona": "AZ", "Arkansas": "AR",
-        "California": "CA", "Colorado": "CO", "Connecticut": "CT", "Delaware": "DE",
-        "Florida": "FL", "Georgia": "GA", "Hawaii": "HI", "Idaho": "ID",
-        "Illinois": "IL", "Indiana": "IN", "Iowa": "IA", "Kansas": "KS",
-        "Kentucky": "KY", "Louisiana": "LA", "Maine": "ME", "Maryland": "MD",
-        "Massachusetts": "MA", "Michigan": "MI", "Minnesota": "MN", "Mississippi": "MS",
-        "Missouri": "MO", "Montana": "MT", "Nebraska": "NE", "Nevada": "NV",
-        "New Hampshire": "NH", "New Jersey": "NJ", "New Mexico": "NM", "New York": "NY",
-        "North Carolina": "NC", "North Dakota": "ND", "Ohio": "OH", "Oklahoma": "OK",
-        "Oregon": "OR", "Pennsylvania": "PA", "Rhode Island": "RI", "South Carolina": "SC",
-        "South Dakota": "SD", "Tennessee": "TN", "Texas": "TX", "Utah": "UT",
-        "Vermont": "VT", "Virginia": "VA", "Washington": "WA", "West Virginia": "WV",
-        "Wisconsin": "WI", "Wyoming": "WY", "District of Columbia": "DC"
-    }
-    
-    grouped = df.groupby("State", observed=True).agg({
-        "Sales": "sum",
-        "Profit": "sum",
-        "Order ID": "nunique",
-    }).reset_index()
-    
-    records = []
-    for _, row in grouped.iterrows():
-        state_name = str(row["State"])
-        state_code = state_abbrev.get(state_name, "")
-        if state_code:
-            records.append({
-                "state": state_name,
-                "state_code": state_code,
-                "sales": round(float(row["Sales"]), 2),
-                "profit": round(float(row["Profit"]), 2),
-                "orders": int(row["Order ID"]),
-            })
-    
-    return records
+    grouped = _aggregate(
+        df, "State",
+        sales=("Sales", "sum"),
+        profit=("Profit", "sum"),
+        orders=("Order ID", "nunique"),
+    ).rename(columns={"State": "state"})
+    grouped["state"] = grouped["state"].astype(str)
+    grouped.insert(1, "state_code", grouped["state"].map(_STATE_CODES))
+    grouped = grouped[grouped["state_code"].notna()]
+    grouped = grouped.round({"sales": 2, "profit": 2})
+    return _to_records(grouped)
@@ -1,215 +1,272 @@
-"""Chart builder functions for Plotly visualizations."""
-from typing import Any, Dict, List
+"""Chart builder functions for Plotly visualizations.
 
-import plotly.graph_objects as go
+Figures are built directly as plain dicts in Plotly's JSON schema, which is
+what the frontend consumes, so no ``go.Figure`` validation or
+``to_plotly_json`` conversion runs per request.
+
+Currency axes pick their tick format from the plotted values unless the
+caller passes one, e.g. a format shared by every chart in a dashboard.
+"""
+from functools import lru_cache
+from itertools import chain
+from operator import itemgetter
+from typing import Any, Dict, List, Optional, Tuple
 
 from app.services.chart_styles import (
     COLORS,
     NEGATIVE_COLOR,
+    TEMPLATE,
     auto_currency_tickformat,
     axis_style,
     base_layout,
 )
 
+# Hover templates with a <fmt> slot for the currency tick format
+_X_SALES_HOVER = "<b>%{x}</b><br>Sales: %{y:<fmt>}<extra></extra>"
+_X_PROFIT_HOVER = "<b>%{x}</b><br>Profit: %{y:<fmt>}<extra></extra>"
+_PIE_SALES_HOVER = "<b>%{label}</b><br>Sales: %{value:<fmt>}<br>Share: %{percent}<extra></extra>"
+_TREND_SALES_HOVER = "Sales: %{y:<fmt>}<extra></extra>"
+_TREND_PROFIT_HOVER = "Profit: %{y:<fmt>}<extra></extra>"
+_BAR_PROFIT_HOVER = "<b>%{y}</b><br>Profit: %{x:<fmt>}<extra></extra>"
+
+# Constant trace styles, built once and shared by every chart; like the base
+# layout they must not be modified in place.
+_WHITE_OUTLINE = {"width": 2, "color": "white"}
+_SALES_BAR_MARKER = {"color": COLORS[0], "line": {"width": 0}}
+_PROFIT_BAR_MARKER = {"color": COLORS[1], "line": {"width": 0}}
+_PIE_MARKER = {"colors": COLORS, "line": _WHITE_OUTLINE}
+_TREND_SALES_LINE = {"color": COLORS[0], "width": 2.5, "shape": "spline"}
+_TREND_SALES_MARKER = {"size": 7, "color": COLORS[0], "line": _WHITE_OUTLINE}
+_TREND_PROFIT_LINE = {"color": COLORS[1], "width": 2.5, "dash": "dot", "shape": "spline"}
+_TREND_PROFIT_MARKER = {"size": 7, "color": COLORS[1], "line": _WHITE_OUTLINE}
+_CUSTOMERS_LINE = {"color": COLORS[2], "width": 3}
+_CUSTOMERS_MARKER = {"size": 10, "color": COLORS[2], "line": _WHITE_OUTLINE}
+
+
+@lru_cache(maxsize=64)
+def _hovertemplate(template: str, fmt: str) -> str:
+    """Fill a hover template's format slot; each (template, format) is built once."""
+    return template.replace("<fmt>", fmt)
+
+
+def _columns(data: List[Dict[str, Any]], *keys: str) -> Tuple[List[Any], ...]:
+    """Split records into one list per key (two or more) in a single pass."""
+    if not data:
+        return tuple([] for _ in keys)
+    return tuple(map(list, zip(*map(itemgetter(*keys), data))))
 
-def create_category_chart(data: List[Dict[str, Any]]) -> Dict[str, Any]:
+
+def create_category_chart(
+    data: List[Dict[str, Any]], y_fmt: Optional[str] = None
+) -> Dict[str, Any]:
     """Create a bar chart for sales by category."""
-    categories = [d["category"] for d in data]
-    sales = [d["sales"] for d in data]
-    profit = [d["profit"] for d in data]
-    y_fmt = auto_currency_tickformat([*sales, *profit])
-
-    fig = go.Figure()
-    fig.add_trace(go.Bar(
-        name="Sales",
-        x=categories,
-        y=sales,
-        marker_color=COLORS[0],
-        marker_line_width=0,
-        hovertemplate="<b>%{x}</b><br>Sales: %{y:" + y_fmt + "}<extra></extra>",
-    ))
-    fig.add_trace(go.Bar(
-        name="Profit",
-        x=categories,
-        y=profit,
-        marker_color=COLORS[1],
-        marker_line_width=0,
-        hovertemplate="<b>%{x}</b><br>Profit: %{y:" + y_fmt + "}<extra></extra>",
-    ))
+    categories, sales, profit = _columns(data, "category", "sales", "profit")
+    y_fmt = y_fmt or auto_currency_tickformat(chain(sales, profit))
+
     layout = base_layout("Sales and Profit by Category")
     layout["barmode"] = "group"
     layout["bargap"] = 0.35
     layout["bargroupgap"] = 0.15
-    fig.update_layout(**layout)
-    fig.update_xaxes(**axis_style("Category", showgrid=False))
-    fig.update_yaxes(**axis_style("Amount", tickformat=y_fmt))
-    return fig.to_plotly_json()
+    layout["xaxis"] = axis_style("Category", showgrid=False)
+    layout["yaxis"] = axis_style("Amount", tickformat=y_fmt)
+    return {
+        "data": [
+            {
+                "type": "bar",
+                "name": "Sales",
+                "x": categories,
+                "y": sales,
+                "marker": _SALES_BAR_MARKER,
+                "hovertemplate": _hovertemplate(_X_SALES_HOVER, y_fmt),
+            },
+            {
+                "type": "bar",
+                "name": "Profit",
+                "x": categories,
+                "y": profit,
+                "marker": _PROFIT_BAR_MARKER,
+                "hovertemplate": _hovertemplate(_X_PROFIT_HOVER, y_fmt),
+            },
+        ],
+        "layout": layout,
+    }
 
 
-def create_region_chart(data: List[Dict[str, Any]]) -> Dict[str, Any]:
+def create_region_chart(
+    data: List[Dict[str, Any]], y_fmt: Optional[str] = None
+) -> Dict[str, Any]:
     """Create a pie chart for sales by region."""
-    regions = [d["region"] for d in data]
-    sales = [d["sales"] for d in data]
-    y_fmt = auto_currency_tickformat(sales)
-
-    fig = go.Figure(data=[go.Pie(
-        labels=regions,
-        values=sales,
-        hole=0.5,
-        marker_colors=COLORS,
-        marker_line_width=2,
-        marker_line_color="white",
-        sort=False,
-        textposition="outside",
-        textinfo="label+percent",
-        textfont=dict(size=11),
-        insidetextorientation="horizontal",
-        pull=[0.01] * len(regions),
-        hovertemplate="<b>%{label}</b><br>Sales: %{value:" + y_fmt + "}<br>Share: %{percent}<extra></extra>",
-    )])
+    regions, sales = _columns(data, "region", "sales")
+    y_fmt = y_fmt or auto_currency_tickformat(sales)
+
     layout = base_layout("", showlegend=False)
     layout["margin"] = {"l": 20, "r": 20, "t": 20, "b": 20}
-    fig.update_layout(**layout)
-    return fig.to_plotly_json()
+    return {
+        "data": [{
+            "type": "pie",
+            "labels": regions,
+            "values": sales,
+            "hole": 0.5,
+            "marker": _PIE_MARKER,
+            "sort": False,
+            "textposition": "outside",
+            "textinfo": "label+percent",
+            "textfont": {"size": 11},
+            "insidetextorientation": "horizontal",
+            "pull": [0.01] * len(regions),
+            "hovertemplate": _hovertemplate(_PIE_SALES_HOVER, y_fmt),
+        }],
+        "layout": layout,
+    }
 
 
-def create_trends_chart(data: List[Dict[str, Any]]) -> Dict[str, Any]:
+def create_trends_chart(
+    data: List[Dict[str, Any]], y_fmt: Optional[str] = None
+) -> Dict[str, Any]:
     """Create a line chart for sales trends."""
-    months = [d["month"] for d in data]
-    sales = [d["sales"] for d in data]
-    profit = [d["profit"] for d in data]
-    y_fmt = auto_currency_tickformat([*sales, *profit])
-
-    fig = go.Figure()
-    fig.add_trace(go.Scatter(
-        x=months, y=sales, mode="lines+markers", name="Sales",
-        line=dict(color=COLORS[0], width=2.5, shape="spline"),
-        marker=dict(size=7, color=COLORS[0], line=dict(width=2, color="white")),
-        hovertemplate="Sales: %{y:" + y_fmt + "}<extra></extra>",
-    ))
-    fig.add_trace(go.Scatter(
-        x=months, y=profit, mode="lines+markers", name="Profit",
-        line=dict(color=COLORS[1], width=2.5, dash="dot", shape="spline"),
-        marker=dict(size=7, color=COLORS[1], line=dict(width=2, color="white")),
-        hovertemplate="Profit: %{y:" + y_fmt + "}<extra></extra>",
-    ))
-    fig.update_layout(**base_layout("Monthly Sales and Profit Trends"))
-    fig.update_xaxes(**{**axis_style("", showgrid=False), "tickangle": -45})
-    fig.update_yaxes(**axis_style("", tickformat=y_fmt))
-    return fig.to_plotly_json()
-
-
-def create_profit_chart(data: List[Dict[str, Any]]) -> Dict[str, Any]:
-    """Create a horizontal bar chart for profit by sub-category."""
-    sorted_data = sorted(data, key=lambda x: x["profit"])
-    sub_categories = [d["sub_category"] for d in sorted_data]
-    profit = [d["profit"] for d in sorted_data]
+    months, sales, profit = _columns(data, "month", "sales", "profit")
+    y_fmt = y_fmt or auto_currency_tickformat(chain(sales, profit))
+
+    layout = base_layout("Monthly Sales and Profit Trends")
+    layout["xaxis"] = axis_style("", showgrid=False, tickangle=-45)
+    layout["yaxis"] = axis_style("", tickformat=y_fmt)
+    return {
+        "data": [
+            {
+                "type": "scatter",
+                "x": months, "y": sales, "mode": "lines+markers", "name": "Sales",
+                "line": _TREND_SALES_LINE,
+                "marker": _TREND_SALES_MARKER,
+                "hovertemplate": _hovertemplate(_TREND_SALES_HOVER, y_fmt),
+            },
+            {
+                "type": "scatter",
+                "x": months, "y": profit, "mode": "lines+markers", "name": "Profit",
+                "line": _TREND_PROFIT_LINE,
+                "marker": _TREND_PROFIT_MARKER,
+                "hovertemplate": _hovertemplate(_TREND_PROFIT_HOVER, y_fmt),
+            },
+        ],
+        "layout": layout,
+    }
+
+
+def create_profit_chart(
+    data: List[Dict[str, Any]], x_fmt: Optional[str] = None
+) -> Dict[str, Any]:
+    """Create a horizontal bar chart for profit by sub-category.
+
+    Records are plotted in the given order; compute_profit_analysis returns
+    them sorted by ascending profit.
+    """
+    sub_categories, profit = _columns(data, "sub_category", "profit")
     colors = [COLORS[1] if p >= 0 else NEGATIVE_COLOR for p in profit]
-    x_fmt = auto_currency_tickformat(profit)
-
-    fig = go.Figure(data=[go.Bar(
-        y=sub_categories, x=profit, orientation="h",
-        marker_color=colors,
-        marker_line_width=0,
-        hovertemplate="<b>%{y}</b><br>Profit: %{x:" + x_fmt + "}<extra></extra>",
-    )])
+    x_fmt = x_fmt or auto_currency_tickformat(profit)
+
     layout = base_layout("", height=520, showlegend=False)
     layout["bargap"] = 0.3
     layout["margin"] = {"l": 110, "r": 25, "t": 20, "b": 45}
-    fig.update_layout(**layout)
-    fig.update_xaxes(**axis_style("Profit", tickformat=x_fmt))
-    fig.update_yaxes(**axis_style("", showgrid=False))
-    return fig.to_plotly_json()
+    layout["xaxis"] = axis_style("Profit", tickformat=x_fmt)
+    layout["yaxis"] = axis_style("", showgrid=False)
+    return {
+        "data": [{
+            "type": "bar",
+            "y": sub_categories, "x": profit, "orientation": "h",
+            "marker": {"color": colors, "line": {"width": 0}},
+            "hovertemplate": _hovertemplate(_BAR_PROFIT_HOVER, x_fmt),
+        }],
+        "layout": layout,
+    }
 
 
-def create_segment_chart(data: List[Dict[str, Any]]) -> Dict[str, Any]:
+def create_segment_chart(
+    data: List[Dict[str, Any]], sales_fmt: Optional[str] = None
+) -> Dict[str, Any]:
     """Create a bar chart for segment analysis."""
-    segments = [d["segment"] for d in data]
-    sales = [d["sales"] for d in data]
-    customers = [d["customers"] for d in data]
-    sales_fmt = auto_currency_tickformat(sales)
-
-    fig = go.Figure()
-    fig.add_trace(go.Bar(
-        name="Sales ($)", x=segments, y=sales,
-        marker_color=COLORS[0],
-        marker_line_width=0,
-        yaxis="y",
-        hovertemplate="<b>%{x}</b><br>Sales: %{y:" + sales_fmt + "}<extra></extra>",
-    ))
-    fig.add_trace(go.Scatter(
-        name="Customers", x=segments, y=customers, mode="lines+markers",
-        line=dict(color=COLORS[2], width=3),
-        marker=dict(size=10, color=COLORS[2], line=dict(width=2, color="white")),
-        yaxis="y2",
-        hovertemplate="<b>%{x}</b><br>Customers: %{y:,}<extra></extra>",
-    ))
+    segments, sales, customers = _columns(data, "segment", "sales", "customers")
+    sales_fmt = sales_fmt or auto_currency_tickformat(sales)
+
     layout = base_layout("Sales and Customers by Segment")
     layout["bargap"] = 0.5
-    fig.update_layout(**layout)
-    fig.update_xaxes(**axis_style("", showgrid=False))
-    fig.update_layout(
-        yaxis=axis_style("Sales", tickformat=sales_fmt),
-        yaxis2={**axis_style("Customers", tickformat=","), "side": "right", "overlaying": "y"},
+    layout["xaxis"] = axis_style("", showgrid=False)
+    layout["yaxis"] = axis_style("Sales", tickformat=sales_fmt)
+    layout["yaxis2"] = axis_style(
+        "Customers", tickformat=",", side="right", overlaying="y"
     )
-    return fig.to_plotly_json()
+    return {
+        "data": [
+            {
+                "type": "bar",
+                "name": "Sales ($)", "x": segments, "y": sales,
+                "marker": _SALES_BAR_MARKER,
+                "yaxis": "y",
+                "hovertemplate": _hovertemplate(_X_SALES_HOVER, sales_fmt),
+            },
+            {
+                "type": "scatter",
+                "name": "Customers", "x": segments, "y": customers, "mode": "lines+markers",
+                "line": _CUSTOMERS_LINE,
+                "marker": _CUSTOMERS_MARKER,
+                "yaxis": "y2",
+                "hovertemplate": "<b>%{x}</b><br>Customers: %{y:,}<extra></extra>",
+            },
+        ],
+        "layout": layout,
+    }
 
 
 def create_choropleth_map(data: List[Dict[str, Any]]) -> Dict[str, Any]:
     """Create a US choropleth map for sales by state."""
-    states = [d["state_code"] for d in data]
-    state_names = [d["state"] for d in data]
-    sales = [d["sales"] for d in data]
-    profit = [d["profit"] for d in data]
-    orders = [d["orders"] for d in data]
-    
-    fig = go.Figure(data=go.Choropleth(
-        locations=states,
-        z=sales,
-        locationmode="USA-states",
-        colorscale=[
-            [0, "#e8f5e9"],
-            [0.2, "#a5d6a7"],
-            [0.4, "#66bb6a"],
-            [0.6, "#43a047"],
-            [0.8, "#2e7d32"],
-            [1, "#1b5e20"]
-        ],
-        colorbar=dict(
-            title=dict(text="Sales ($)", font=dict(size=12)),
-            tickformat="$,.0f",
-            len=0.6,
-            thickness=15,
-            x=1.0,
-        ),
-        marker_line_color="white",
-        marker_line_width=1.5,
-        customdata=list(zip(state_names, profit, orders)),
-        hovertemplate=(
-            "<b>%{customdata[0]}</b><br>"
-            "Sales: $%{z:,.0f}<br>"
-            "Profit: $%{customdata[1]:,.0f}<br>"
-            "Orders: %{customdata[2]:,}<extra></extra>"
-        ),
-    ))
-    
-    fig.update_layout(
-        geo=dict(
-            scope="usa",
-            bgcolor="rgba(248,250,252,0.95)",
-            lakecolor="rgba(200,230,255,0.5)",
-            landcolor="rgba(243,244,246,1)",
-            showlakes=True,
-            showland=True,
-            subunitcolor="white",
-            subunitwidth=1,
-            projection=dict(type="albers usa"),
-            fitbounds="locations",
-        ),
-        margin=dict(l=0, r=0, t=10, b=0),
-        paper_bgcolor="white",
-        font=dict(family="Inter, system-ui, sans-serif", size=11, color="#181818"),
-        autosize=True,
-    )
-    
-    return fig.to_plotly_json()
+    states, sales = _columns(data, "state_code", "sales")
+    customdata = [list(row) for row in map(itemgetter("state", "profit", "orders"), data)]
+
+    return {
+        "data": [{
+            "type": "choropleth",
+            "locations": states,
+            "z": sales,
+            "locationmode": "USA-states",
+            "colorscale": [
+                [0, "#e8f5e9"],
+                [0.2, "#a5d6a7"],
+                [0.4, "#66bb6a"],
+                [0.6, "#43a047"],
+                [0.8, "#2e7d32"],
+                [1, "#1b5e20"]
+            ],
+            "colorbar": {
+                "title": {"text": "Sales ($)", "font": {"size": 12}},
+                "tickformat": "$,.0f",
+                "len": 0.6,
+                "thickness": 15,
+                "x": 1.0,
+            },
+            "marker": {"line": {"color": "white", "width": 1.5}},
+            "customdata": customdata,
+            "hovertemplate": (
+                "<b>%{customdata[0]}</b><br>"
+                "Sales: $%{z:,.0f}<br>"
+                "Profit: $%{customdata[1]:,.0f}<br>"
+                "Orders: %{customdata[2]:,}<extra></extra>"
+            ),
+        }],
+        "layout": {
+            "template": TEMPLATE,
+            "geo": {
+                "scope": "usa",
+                "bgcolor": "rgba(248,250,252,0.95)",
+                "lakecolor": "rgba(200,230,255,0.5)",
+                "landcolor": "rgba(243,244,246,1)",
+                "showlakes": True,
+                "showland": True,
+                "subunitcolor": "white",
+                "subunitwidth": 1,
+                "projection": {"type": "albers usa"},
+                "fitbounds": "locations",
+            },
+            "margin": {"l": 0, "r": 0, "t": 10, "b": 0},
+            "paper_bgcolor": "white",
+            "font": {"family": "Inter, system-ui, sans-serif", "size": 11, "color": "#181818"},
+            "autosize": True,
+        },
+    }
@@ -1,37 +1,85 @@
 """Chart service for creating Plotly visualizations."""
-from typing import Any, Dict, List
+from concurrent.futures import Executor
+from typing import Any, Dict, List, Optional
 
 from app.services.data_service import DataService
 from app.services import chart_builders
+from app.services.workers import DASHBOARD_POOL
 
 
 class ChartService:
-    """Facade service for chart generation."""
+    """Facade service for chart generation.
+
+    One instance lives for the app's lifetime (see ``get_chart_service``).
+    """
+
+    __slots__ = ("data_service",)
+
+    # Dashboard section name -> chart method building it from that section's records
+    DASHBOARD_CHARTS = {
+        "category": "create_category_chart",
+        "region": "create_region_chart",
+        "trends": "create_trends_chart",
+        "profit": "create_profit_chart",
+        "segment": "create_segment_chart",
+        "states": "create_choropleth_map",
+    }
 
     def __init__(self, data_service: DataService) -> None:
         """Initialize with a data service."""
         self.data_service = data_service
 
-    def create_category_chart(self, data: List[Dict[str, Any]]) -> Dict[str, Any]:
+    def create_category_chart(
+        self, data: List[Dict[str, Any]], y_fmt: Optional[str] = None
+    ) -> Dict[str, Any]:
         """Create a bar chart for sales by category."""
-        return chart_builders.create_category_chart(data)
+        return chart_builders.create_category_chart(data, y_fmt)
 
-    def create_region_chart(self, data: List[Dict[str, Any]]) -> Dict[str, Any]:
+    def create_region_chart(
+        self, data: List[Dict[str, Any]], y_fmt: Optional[str] = None
+    ) -> Dict[str, Any]:
         """Create a pie chart for sales by region."""
-        return chart_builders.create_region_chart(data)
+        return chart_builders.create_region_chart(data, y_fmt)
 
-    def create_trends_chart(self, data: List[Dict[str, Any]]) -> Dict[str, Any]:
+    def create_trends_chart(
+        self, data: List[Dict[str, Any]], y_fmt: Optional[str] = None
+    ) -> Dict[str, Any]:
         """Create a line chart for sales trends."""
-        return chart_builders.create_trends_chart(data)
+        return chart_builders.create_trends_chart(data, y_fmt)
 
-    def create_profit_chart(self, data: List[Dict[str, Any]]) -> Dict[str, Any]:
+    def create_profit_chart(
+        self, data: List[Dict[str, Any]], x_fmt: Optional[str] = None
+    ) -> Dict[str, Any]:
         """Create a horizontal bar chart for profit by sub-category."""
-        return chart_builders.create_profit_chart(data)
+        return chart_builders.create_profit_chart(data, x_fmt)
 
-    def create_segment_chart(self, data: List[Dict[str, Any]]) -> Dict[str, Any]:
+    def create_segment_chart(
+        self, data: List[Dict[str, Any]], sales_fmt: Optional[str] = None
+    ) -> Dict[str, Any]:
         """Create a bar chart for segment analysis."""
-        return chart_builders.create_segment_chart(data)
+        return chart_builders.create_segment_chart(data, sales_fmt)
 
     def create_choropleth_map(self, data: List[Dict[str, Any]]) -> Dict[str, Any]:
         """Create a US choropleth map for sales by state."""
         return chart_builders.create_choropleth_map(data)
+
+    def build_dashboard(
+        self,
+        aggregates: Dict[str, Any],
+        executor: Optional[Executor] = DASHBOARD_POOL,
+    ) -> Dict[str, Dict[str, Any]]:
+        """Create every dashboard chart from DataService.get_dashboard output.
+
+        The builders are independent and only read their input, so with an
+        executor they run concurrently.
+        """
+        builders = {
+            name: getattr(self, method) for name, method in self.DASHBOARD_CHARTS.items()
+        }
+        if executor is None:
+            return {name: build(aggregates[name]) for name, build in builders.items()}
+        futures = {
+            name: executor.submit(build, aggregates[name])
+            for name, build in builders.items()
+        }
+        return {name: future.result() for name, future in futures.items()}
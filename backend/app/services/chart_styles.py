@@ -1,19 +1,25 @@
 """Shared chart styling utilities."""
-from typing import Any, Dict, List, Optional
+from types import MappingProxyType
+from typing import Any, Dict, Iterable, Optional
 
+import numpy as np
+import plotly.io as pio
 
 # Salesforce Lightning Design System inspired palette
-COLORS = [
+COLORS = (
     "#0176d3",  # Salesforce blue
     "#06a59a",  # Teal
     "#b78def",  # Purple
     "#ff6d7e",  # Pink/Coral
     "#ffc95f",  # Yellow
     "#3dba82",  # Green
-]
+)
 
 NEGATIVE_COLOR = "#c23934"  # Salesforce error red
 
+# Plotly's default template, as embedded by go.Figure; serialised once and shared
+TEMPLATE = pio.templates[pio.templates.default].to_plotly_json()
+
 FONT_FAMILY = "'Salesforce Sans', -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, sans-serif"
 
 # Salesforce-style light UI
@@ -23,6 +29,49 @@ _GRID = "rgba(0,0,0,0.06)"
 _TICK = "rgba(0,0,0,0)"
 
 
+# Constant parts of every layout and axis, read-only at the top level. Callers
+# get shallow copies, so the nested dicts are shared between charts and must
+# not be modified in place.
+_BASE_LAYOUT = MappingProxyType({
+    "template": TEMPLATE,
+    "title": {},  # Title handled by card header in frontend
+    "paper_bgcolor": "rgba(0,0,0,0)",
+    "plot_bgcolor": "rgba(0,0,0,0)",
+    "font": {"family": FONT_FAMILY, "size": 12, "color": _TEXT},
+    "margin": {"l": 65, "r": 25, "t": 40, "b": 45, "pad": 4},
+    "legend": {
+        "orientation": "h",
+        "yanchor": "bottom",
+        "y": 1.02,
+        "xanchor": "center",
+        "x": 0.5,
+        "bgcolor": "rgba(0,0,0,0)",
+        "font": {"size": 11, "color": _TEXT_MUTED},
+        "itemsizing": "constant",
+        "tracegroupgap": 20,
+    },
+    "hoverlabel": {
+        "bgcolor": "white",
+        "bordercolor": "#c9c9c9",
+        "font": {"family": FONT_FAMILY, "size": 12, "color": _TEXT},
+    },
+    "hovermode": "x unified",
+})
+
+_AXIS = MappingProxyType({
+    "gridcolor": _GRID,
+    "gridwidth": 1,
+    "zeroline": False,
+    "showline": False,
+    "ticks": "",
+    "tickcolor": _TICK,
+    "tickfont": {"size": 11, "color": _TEXT_MUTED},
+    "automargin": True,
+})
+
+_AXIS_TITLE_FONT = {"size": 12, "color": _TEXT_MUTED}
+
+
 def base_layout(
     title: str,
     *,
@@ -30,32 +79,10 @@ def base_layout(
     showlegend: bool = True,
 ) -> Dict[str, Any]:
     """Create base layout for embedding in glass cards."""
-    return {
-        "title": None,  # Title handled by card header in frontend
-        "paper_bgcolor": "rgba(0,0,0,0)",
-        "plot_bgcolor": "rgba(0,0,0,0)",
-        "font": {"family": FONT_FAMILY, "size": 12, "color": _TEXT},
-        "margin": {"l": 65, "r": 25, "t": 40, "b": 45, "pad": 4},
-        "height": height,
-        "showlegend": showlegend,
-        "legend": {
-            "orientation": "h",
-            "yanchor": "bottom",
-            "y": 1.02,
-            "xanchor": "center",
-            "x": 0.5,
-            "bgcolor": "rgba(0,0,0,0)",
-            "font": {"size": 11, "color": _TEXT_MUTED},
-            "itemsizing": "constant",
-            "tracegroupgap": 20,
-        },
-        "hoverlabel": {
-            "bgcolor": "white",
-            "bordercolor": "#c9c9c9",
-            "font": {"family": FONT_FAMILY, "size": 12, "color": _TEXT},
-        },
-        "hovermode": "x unified",
-    }
+    layout = {**_BASE_LAYOUT, "showlegend": showlegend}
+    if height is not None:
+        layout["height"] = height
+    return layout
 
 
 def axis_style(
@@ -63,30 +90,43 @@ def axis_style(
     *,
     tickformat: Optional[str] = None,
     showgrid: bool = True,
+    **extra: Any,
 ) -> Dict[str, Any]:
-    """Create consistent axis styling."""
-    return {
-        "title": {
-            "text": title,
-            "standoff": 16,
-            "font": {"size": 12, "color": _TEXT_MUTED},
-        },
+    """Create consistent axis styling; ``extra`` adds or overrides axis keys."""
+    style = {
+        **_AXIS,
+        "title": {"text": title, "standoff": 16, "font": _AXIS_TITLE_FONT},
         "showgrid": showgrid,
-        "gridcolor": _GRID,
-        "gridwidth": 1,
-        "zeroline": False,
-        "showline": False,
-        "ticks": "",
-        "tickcolor": _TICK,
-        "tickfont": {"size": 11, "color": _TEXT_MUTED},
-        "tickformat": tickformat,
-        "automargin": True,
+        **extra,
     }
+    if tickformat is not None:
+        style["tickformat"] = tickformat
+    return style
+
+
+# Above this many values, converting a list to an array beats the Python loop
+_VECTORISE_MIN_LENGTH = 256
+
+
+def _max_magnitude(values: Iterable[float]) -> float:
+    """Largest absolute value, ignoring missing values; 0.0 when there are none."""
+    if hasattr(values, "__array__") or (
+        isinstance(values, (list, tuple)) and len(values) >= _VECTORISE_MIN_LENGTH
+    ):
+        # Reduce in C instead of looping; None becomes NaN on conversion
+        magnitudes = np.abs(np.asarray(values, dtype=np.float64))
+        magnitudes = magnitudes[~np.isnan(magnitudes)]
+        return float(magnitudes.max()) if magnitudes.size else 0.0
+    return max((abs(float(v)) for v in values if v is not None), default=0.0)
+
 
+def auto_currency_tickformat(values: Iterable[float]) -> str:
+    """Choose reasonable currency tickformat based on magnitude.
 
-def auto_currency_tickformat(values: List[float]) -> str:
-    """Choose reasonable currency tickformat based on magnitude."""
-    mag = max((abs(float(v)) for v in values if v is not None), default=0.0)
+    Accepts any iterable of numbers; numpy arrays and pandas Series are
+    scanned with a vectorised reduction.
+    """
+    mag = _max_magnitude(values)
     if mag >= 1_000_000:
         return "$,.2s"
     if mag >= 10_000:
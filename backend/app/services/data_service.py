@@ -1,10 +1,23 @@
 """Data service facade for sales analytics."""
 from datetime import datetime
-from typing import Any, Dict, List, Optional
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import pandas as pd
 
 from app.services.repository import DataRepository
-from app.services.filters import apply_filters
+from app.services.filters import DateLike, apply_filters
 from app.services import analytics
+from app.services.workers import DASHBOARD_POOL
+
+# Dashboards fire every chart endpoint with the same filters, so a handful of
+# filtered views is enough to share one filter pass across all of them.
+FILTERED_VIEW_CACHE_SIZE = 8
+
+
+def _as_key(values: Optional[Sequence[str]]) -> Optional[Tuple[str, ...]]:
+    """Convert a filter value list into a hashable cache key part."""
+    return tuple(values) if values else None
 
 
 class DataService:
@@ -14,12 +27,23 @@ class DataService:
         """Initialize with optional repository injection."""
         self._repo = repository or DataRepository()
         self._df = None
+        self._df_version = None
+        self._view_source = None
+        self._filtered_view = lru_cache(maxsize=FILTERED_VIEW_CACHE_SIZE)(
+            self._apply_filters
+        )
 
     @property
     def df(self):
-        """Lazy load the dataframe."""
-        if self._df is None:
+        """Lazy load the dataframe, reloading it when the repository's data changes.
+
+        A repository refresh changes its data version; the next access then
+        picks up the new frame, and the filtered views built from the old
+        one are dropped.
+        """
+        if self._df is None or self._df_version != self._repo.data_version:
             self._df = self._repo.get_dataframe()
+            self._df_version = self._repo.data_version
         return self._df
 
     @property
@@ -27,26 +51,52 @@ class DataService:
         """Get last data refresh timestamp."""
         return self._repo.last_refresh
 
+    @property
+    def data_version(self) -> Optional[str]:
+        """Get the content hash of the loaded data."""
+        return self._repo.data_version
+
     def _get_filtered_df(
         self,
-        start_date: Optional[str] = None,
-        end_date: Optional[str] = None,
-        regions: Optional[List[str]] = None,
-        segments: Optional[List[str]] = None,
-        categories: Optional[List[str]] = None,
+        start_date: Optional[DateLike] = None,
+        end_date: Optional[DateLike] = None,
+        regions: Optional[Sequence[str]] = None,
+        segments: Optional[Sequence[str]] = None,
+        categories: Optional[Sequence[str]] = None,
     ):
-        """Get filtered dataframe."""
+        """Get filtered dataframe.
+
+        Views are memoized per filter combination and shared between the
+        analytics methods, so they must be treated as read-only.
+        """
+        df = self.df
+        if df is not self._view_source:
+            self._filtered_view.cache_clear()
+            self._view_source = df
+        return self._filtered_view(
+            start_date, end_date, _as_key(regions), _as_key(segments), _as_key(categories)
+        )
+
+    def _apply_filters(
+        self,
+        start_date: Optional[DateLike],
+        end_date: Optional[DateLike],
+        regions: Optional[Tuple[str, ...]],
+        segments: Optional[Tuple[str, ...]],
+        categories: Optional[Tuple[str, ...]],
+    ) -> pd.DataFrame:
+        """Filter the loaded dataframe; backs the filtered view cache."""
         return apply_filters(
-            self.df, start_date, end_date, regions, segments, categories
+            self._view_source, start_date, end_date, regions, segments, categories
         )
 
     def get_overview_metrics(
         self,
-        start_date: Optional[str] = None,
-        end_date: Optional[str] = None,
-        regions: Optional[List[str]] = None,
-        segments: Optional[List[str]] = None,
-        categories: Optional[List[str]] = None,
+        start_date: Optional[DateLike] = None,
+        end_date: Optional[DateLike] = None,
+        regions: Optional[Sequence[str]] = None,
+        segments: Optional[Sequence[str]] = None,
+        categories: Optional[Sequence[str]] = None,
     ) -> Dict[str, Any]:
         """Get high-level sales metrics."""
         df = self._get_filtered_df(start_date, end_date, regions, segments, categories)
@@ -54,11 +104,11 @@ class DataService:
 
     def get_sales_by_category(
         self,
-        start_date: Optional[str] = None,
-        end_date: Optional[str] = None,
-        regions: Optional[List[str]] = None,
-        segments: Optional[List[str]] = None,
-        categories: Optional[List[str]] = None,
+        start_date: Optional[DateLike] = None,
+        end_date: Optional[DateLike] = None,
+        regions: Optional[Sequence[str]] = None,
+        segments: Optional[Sequence[str]] = None,
+        categories: Optional[Sequence[str]] = None,
     ) -> List[Dict[str, Any]]:
         """Get sales grouped by category."""
         df = self._get_filtered_df(start_date, end_date, regions, segments, categories)
@@ -66,11 +116,11 @@ class DataService:
 
     def get_sales_by_region(
         self,
-        start_date: Optional[str] = None,
-        end_date: Optional[str] = None,
-        regions: Optional[List[str]] = None,
-        segments: Optional[List[str]] = None,
-        categories: Optional[List[str]] = None,
+        start_date: Optional[DateLike] = None,
+        end_date: Optional[DateLike] = None,
+        regions: Optional[Sequence[str]] = None,
+        segments: Optional[Sequence[str]] = None,
+        categories: Optional[Sequence[str]] = None,
     ) -> List[Dict[str, Any]]:
         """Get sales grouped by region."""
         df = self._get_filtered_df(start_date, end_date, regions, segments, categories)
@@ -78,11 +128,11 @@ class DataService:
 
     def get_sales_trends(
         self,
-        start_date: Optional[str] = None,
-        end_date: Optional[str] = None,
-        regions: Optional[List[str]] = None,
-        segments: Optional[List[str]] = None,
-        categories: Optional[List[str]] = None,
+        start_date: Optional[DateLike] = None,
+        end_date: Optional[DateLike] = None,
+        regions: Optional[Sequence[str]] = None,
+        segments: Optional[Sequence[str]] = None,
+        categories: Optional[Sequence[str]] = None,
     ) -> List[Dict[str, Any]]:
         """Get monthly sales trends."""
         df = self._get_filtered_df(start_date, end_date, regions, segments, categories)
@@ -90,11 +140,11 @@ class DataService:
 
     def get_profit_analysis(
         self,
-        start_date: Optional[str] = None,
-        end_date: Optional[str] = None,
-        regions: Optional[List[str]] = None,
-        segments: Optional[List[str]] = None,
-        categories: Optional[List[str]] = None,
+        start_date: Optional[DateLike] = None,
+        end_date: Optional[DateLike] = None,
+        regions: Optional[Sequence[str]] = None,
+        segments: Optional[Sequence[str]] = None,
+        categories: Optional[Sequence[str]] = None,
     ) -> List[Dict[str, Any]]:
         """Get profit analysis by sub-category."""
         df = self._get_filtered_df(start_date, end_date, regions, segments, categories)
@@ -102,11 +152,11 @@ class DataService:
 
     def get_segment_analysis(
         self,
-        start_date: Optional[str] = None,
-        end_date: Optional[str] = None,
-        regions: Optional[List[str]] = None,
-        segments: Optional[List[str]] = None,
-        categories: Optional[List[str]] = None,
+        start_date: Optional[DateLike] = None,
+        end_date: Optional[DateLike] = None,
+        regions: Optional[Sequence[str]] = None,
+        segments: Optional[Sequence[str]] = None,
+        categories: Optional[Sequence[str]] = None,
     ) -> List[Dict[str, Any]]:
         """Get sales analysis by customer segment."""
         df = self._get_filtered_df(start_date, end_date, regions, segments, categories)
@@ -114,16 +164,28 @@ class DataService:
 
     def get_state_sales(
         self,
-        start_date: Optional[str] = None,
-        end_date: Optional[str] = None,
-        regions: Optional[List[str]] = None,
-        segments: Optional[List[str]] = None,
-        categories: Optional[List[str]] = None,
+        start_date: Optional[DateLike] = None,
+        end_date: Optional[DateLike] = None,
+        regions: Optional[Sequence[str]] = None,
+        segments: Optional[Sequence[str]] = None,
+        categories: Optional[Sequence[str]] = None,
     ) -> List[Dict[str, Any]]:
         """Get sales data by state for choropleth map."""
         df = self._get_filtered_df(start_date, end_date, regions, segments, categories)
         return analytics.compute_state_sales(df)
 
+    def get_dashboard(
+        self,
+        start_date: Optional[DateLike] = None,
+        end_date: Optional[DateLike] = None,
+        regions: Optional[Sequence[str]] = None,
+        segments: Optional[Sequence[str]] = None,
+        categories: Optional[Sequence[str]] = None,
+    ) -> Dict[str, Any]:
+        """Get every dashboard aggregate from a single filtered view."""
+        df = self._get_filtered_df(start_date, end_date, regions, segments, categories)
+        return analytics.compute_dashboard(df, DASHBOARD_POOL)
+
     def get_filter_options(self) -> Dict[str, Any]:
         """Get available filter options."""
-        return analytics.compute_filter_options(self.df)
+        return self._repo.get_filter_options()
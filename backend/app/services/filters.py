@@ -1,19 +1,103 @@
 """DataFrame filtering utilities."""
-from typing import List, Optional
+from dataclasses import dataclass
+from datetime import date
+from functools import lru_cache
+from typing import Iterable, Optional, Sequence, Tuple, Union
 
+import numpy as np
 import pandas as pd
 
+DateLike = Union[str, date]
+
+# Name of the sorted DatetimeIndex the repository puts on loaded data; frames
+# carrying it are date-filtered by binary search instead of a full scan.
+ORDER_DATE_INDEX = "order_date"
+
+
+def _canonical_values(values: Optional[Iterable[str]]) -> Tuple[str, ...]:
+    """Deduplicate and sort filter values so equal selections compare equal."""
+    return tuple(sorted(set(values or ())))
+
+
+@dataclass(frozen=True, slots=True)
+class SalesFilters:
+    """Canonical global dashboard filters shared by every sales endpoint.
+
+    Dates are parsed and value lists sorted once per request; the result is
+    hashable, so it doubles as the response cache key.
+    """
+
+    start_date: Optional[date] = None
+    end_date: Optional[date] = None
+    regions: Tuple[str, ...] = ()
+    segments: Tuple[str, ...] = ()
+    categories: Tuple[str, ...] = ()
+
+    @classmethod
+    def from_query(
+        cls,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        regions: Optional[Iterable[str]] = None,
+        segments: Optional[Iterable[str]] = None,
+        categories: Optional[Iterable[str]] = None,
+    ) -> "SalesFilters":
+        """Build canonical filters from raw query values.
+
+        Raises:
+            ValueError: If a date is not in YYYY-MM-DD format
+        """
+        return cls(
+            start_date=date.fromisoformat(start_date) if start_date else None,
+            end_date=date.fromisoformat(end_date) if end_date else None,
+            regions=_canonical_values(regions),
+            segments=_canonical_values(segments),
+            categories=_canonical_values(categories),
+        )
+
+
+@lru_cache(maxsize=64)
+def _as_datetime64(value: DateLike) -> np.datetime64:
+    """Parse a filter date once into a nanosecond datetime64 scalar."""
+    return pd.Timestamp(value).to_datetime64()
+
+
+def _isin_mask(values: pd.Series, selected: Sequence[str]) -> np.ndarray:
+    """Boolean mask of rows whose value is one of ``selected``.
+
+    Categorical columns are tested with a lookup table indexed by category
+    code, which skips the hashing ``Series.isin`` does per row.
+    """
+    if not isinstance(values.dtype, pd.CategoricalDtype):
+        return values.isin(selected).to_numpy()
+    positions = values.cat.categories.get_indexer(list(selected))
+    # One extra False slot at the end, where missing values (code -1) land
+    allowed = np.zeros(len(values.cat.categories) + 1, dtype=bool)
+    allowed[positions[positions >= 0]] = True
+    return allowed[values.cat.codes.to_numpy()]
+
+
+def _is_date_indexed(df: pd.DataFrame) -> bool:
+    """Whether df is indexed by its order dates in ascending order."""
+    return df.index.name == ORDER_DATE_INDEX and df.index.is_monotonic_increasing
+
 
 def apply_filters(
     df: pd.DataFrame,
-    start_date: Optional[str] = None,
-    end_date: Optional[str] = None,
-    regions: Optional[List[str]] = None,
-    segments: Optional[List[str]] = None,
-    categories: Optional[List[str]] = None,
+    start_date: Optional[DateLike] = None,
+    end_date: Optional[DateLike] = None,
+    regions: Optional[Sequence[str]] = None,
+    segments: Optional[Sequence[str]] = None,
+    categories: Optional[Sequence[str]] = None,
 ) -> pd.DataFrame:
     """Apply global filters to dataframe.
     
+    On a frame indexed by sorted order dates (see ``ORDER_DATE_INDEX``) the
+    date range is a positional slice found by binary search. The remaining
+    predicates are combined into one boolean mask, so the frame is indexed
+    once. When nothing is filtered out the source frame itself is returned,
+    so the result must be treated as read-only.
+
     Args:
         df: Source dataframe
         start_date: Filter orders on or after this date (YYYY-MM-DD)
@@ -23,19 +107,26 @@ def apply_filters(
         categories: List of categories to include
         
     Returns:
-        Filtered copy of the dataframe
+        Filtered dataframe, or df itself if every row matches
     """
-    filtered = df.copy()
-    
-    if start_date:
-        filtered = filtered[filtered["Order Date"] >= pd.to_datetime(start_date)]
-    if end_date:
-        filtered = filtered[filtered["Order Date"] <= pd.to_datetime(end_date)]
-    if regions:
-        filtered = filtered[filtered["Region"].isin(regions)]
-    if segments:
-        filtered = filtered[filtered["Segment"].isin(segments)]
-    if categories:
-        filtered = filtered[filtered["Category"].isin(categories)]
-    
-    return filtered
+    masks = []
+    if (start_date or end_date) and _is_date_indexed(df):
+        index = df.index
+        lo = index.searchsorted(_as_datetime64(start_date), "left") if start_date else 0
+        hi = index.searchsorted(_as_datetime64(end_date), "right") if end_date else len(df)
+        if hi - lo < len(df):
+            df = df.iloc[lo:hi]
+    elif start_date or end_date:
+        order_dates = df["Order Date"].to_numpy()
+        if start_date:
+            masks.append(order_dates >= _as_datetime64(start_date))
+        if end_date:
+            masks.append(order_dates <= _as_datetime64(end_date))
+    for column, values in (("Region", regions), ("Segment", segments), ("Category", categories)):
+        if values:
+            masks.append(_isin_mask(df[column], values))
+
+    if not masks:
+        return df
+    mask = np.logical_and.reduce(masks)
+    return df if mask.all() else df[mask]
@@ -1,16 +1,23 @@
 """Data repository for loading Superstore data."""
+import hashlib
 import logging
+import os
+import tempfile
+import threading
 from datetime import datetime, timezone
-from io import BytesIO
-from typing import Optional
+from pathlib import Path
+from typing import Any, Dict, Optional, Sequence, Tuple, Union
 
 import pandas as pd
 import pyarrow as pa
+import pyarrow.feather as feather
 import requests
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
 
-from app.core.config import get_settings
+from app.core.config import Settings, get_settings
+from app.services.analytics import MONTH_COLUMN, compute_filter_options, order_months
+from app.services.filters import ORDER_DATE_INDEX
 
 logger = logging.getLogger(__name__)
 
@@ -34,11 +41,30 @@ class DataRepository:
         "Segment", "Region", "Category", "Sub-Category", "Product Name",
     )
 
-    def __init__(self) -> None:
+    # Columns the service reads; the rest of the file is not converted
+    LOADED_COLUMNS = (
+        "Order Date", "Ship Date", "Sales", "Profit", "Quantity", "Discount",
+        "Order ID", "Customer ID", "Segment", "Region", "State",
+        "Category", "Sub-Category",
+    )
+
+    # Grouping keys and distinct-counted IDs, stored as integer-coded
+    # categoricals so groupbys and nunique work on codes, not strings
+    CATEGORICAL_COLUMNS = (
+        "Region", "Segment", "Category", "Sub-Category", "State",
+        "Order ID", "Customer ID",
+    )
+
+    DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+
+    def __init__(self, settings: Optional[Settings] = None) -> None:
         """Initialize the repository."""
-        self._settings = get_settings()
+        self._settings = settings or get_settings()
         self._df: Optional[pd.DataFrame] = None
         self._last_refresh: Optional[datetime] = None
+        self._data_version: Optional[str] = None
+        self._filter_options: Optional[Dict[str, Any]] = None
+        self._load_lock = threading.Lock()
         self._session = self._create_session()
 
     def _create_session(self) -> requests.Session:
@@ -60,22 +86,190 @@ class DataRepository:
         """Get last refresh timestamp."""
         return self._last_refresh
 
+    @property
+    def data_version(self) -> Optional[str]:
+        """Content hash of the loaded data file, or None before the first load.
+
+        Unlike the refresh time, it is the same in every worker process and
+        across restarts for as long as the source file is unchanged.
+        """
+        return self._data_version
+
     def get_dataframe(self, *, force_refresh: bool = False) -> pd.DataFrame:
-        """Return the dataframe, loading if necessary."""
+        """Return the dataframe, loading if necessary.
+
+        Loads are serialised: threads that find no data wait for the load in
+        progress and share its result instead of each downloading the file.
+        Readers are not blocked by a refresh while data is already loaded.
+        """
         if force_refresh or self._df is None:
-            self._df = self._load()
-            self._last_refresh = datetime.now(timezone.utc)
+            with self._load_lock:
+                if force_refresh or self._df is None:
+                    df, version = self._load(revalidate=force_refresh)
+                    self._filter_options = compute_filter_options(df)
+                    self._df = df
+                    self._data_version = version
+                    self._last_refresh = datetime.now(timezone.utc)
         return self._df
 
-    def _load(self) -> pd.DataFrame:
-        """Load data from the Arrow file."""
+    def get_filter_options(self) -> Dict[str, Any]:
+        """Return filter options computed once per load of the dataset."""
+        self.get_dataframe()
+        return self._filter_options
+
+    def _load(self, *, revalidate: bool = False) -> Tuple[pd.DataFrame, str]:
+        """Load data from the locally cached Arrow file, with its content hash."""
+        source = self._fetch(revalidate=revalidate)
+
+        try:
+            table = self._read_arrow(source)
+        except Exception as e:
+            logger.error(f"Failed to parse Arrow data: {e}")
+            if isinstance(source, Path):
+                self._discard_cache(source)
+            raise DataLoadError(
+                "Failed to parse data file. The data source may be corrupted."
+            ) from e
+        version = self._fingerprint(source)
+
+        try:
+            self._validate_schema(table.column_names)
+        except ValueError as e:
+            logger.error(f"Schema validation failed: {e}")
+            raise DataValidationError(str(e)) from e
+
+        df = self._to_pandas(table)
+        self._coerce_types(df)
+        self._clean_data(df)
+        self._add_derived_columns(df)
+        df = self._index_by_date(df)
+        
+        logger.info(f"Successfully loaded {len(df)} records")
+        return df, version
+
+    def _cache_path(self) -> Path:
+        """Return the on-disk location of the cached Arrow file for the source URL."""
+        url = self._settings.data_source_url
+        digest = hashlib.sha256(url.encode()).hexdigest()[:16]
+        cache_dir = Path(self._settings.data_cache_dir).expanduser()
+        return cache_dir / f"superstore-{digest}.arrow"
+
+    @staticmethod
+    def _etag_path(path: Path) -> Path:
+        """Return the sidecar file holding the ETag of a cached file."""
+        return path.with_name(path.name + ".etag")
+
+    def _fetch(self, *, revalidate: bool = False) -> Union[Path, pa.Buffer]:
+        """Ensure the Arrow file is cached on disk and return its path.
+
+        A cached copy younger than the configured TTL is used as-is. Once it
+        is older, or when ``revalidate`` is set, the stored ETag is sent so an
+        unchanged file is not downloaded again. If the cache directory cannot
+        be written, the downloaded file is returned as an in-memory buffer.
+        """
+        path = self._cache_path()
+        etag_path = self._etag_path(path)
+        if path.exists() and not revalidate and not self._is_stale(path):
+            return path
+
+        headers = {}
+        if path.exists() and etag_path.exists():
+            headers["If-None-Match"] = etag_path.read_text().strip()
+
+        try:
+            response = self._download(headers)
+        except DataLoadError:
+            if path.exists():
+                logger.warning("Revalidation failed; using cached data file")
+                return path
+            raise
+
+        tmp_path: Optional[Path] = None
+        try:
+            if response.status_code == 304:
+                logger.info("Cached data file is up to date")
+                self._mark_fresh(path)
+                return path
+
+            # Write the body as it arrives instead of holding it all in memory.
+            # Each writer gets its own temporary file, so processes filling an
+            # empty cache at the same time never write into each other's file.
+            try:
+                path.parent.mkdir(parents=True, exist_ok=True)
+                tmp_file = tempfile.NamedTemporaryFile(
+                    dir=path.parent, prefix=path.name + ".", suffix=".tmp", delete=False
+                )
+            except OSError as e:
+                logger.warning(f"Data cache is not writable ({e}); loading without caching")
+                return pa.py_buffer(response.content)
+            tmp_path = Path(tmp_file.name)
+            with tmp_file:
+                for chunk in response.iter_content(chunk_size=self.DOWNLOAD_CHUNK_SIZE):
+                    tmp_file.write(chunk)
+            os.replace(tmp_path, path)
+        except requests.RequestException as e:
+            logger.error(f"Download interrupted: {e}")
+            if tmp_path is not None:
+                tmp_path.unlink(missing_ok=True)
+            if path.exists():
+                logger.warning("Revalidation failed; using cached data file")
+                return path
+            raise DataLoadError(f"Failed to load data: {e}") from e
+        except OSError as e:
+            logger.error(f"Failed to write data cache file: {e}")
+            if tmp_path is not None:
+                tmp_path.unlink(missing_ok=True)
+            raise DataLoadError("Failed to write the cached data file.") from e
+        finally:
+            response.close()
+        self._store_etag(etag_path, response.headers.get("ETag"))
+        return path
+
+    def _discard_cache(self, path: Path) -> None:
+        """Delete an unreadable cached file and its ETag so it is downloaded again."""
+        for stale in (path, self._etag_path(path)):
+            try:
+                stale.unlink(missing_ok=True)
+            except OSError as e:
+                logger.warning(f"Could not remove unreadable cache file {stale}: {e}")
+
+    def _mark_fresh(self, path: Path) -> None:
+        """Restart the TTL of a revalidated cached file."""
+        try:
+            path.touch()
+        except OSError as e:
+            logger.warning(f"Could not update cached data file time: {e}")
+
+    def _store_etag(self, etag_path: Path, etag: Optional[str]) -> None:
+        """Record the ETag of the cached file, or forget a stale one.
+
+        A failure only costs a full download on the next revalidation, so it
+        is logged rather than raised.
+        """
+        try:
+            if etag:
+                etag_path.write_text(etag)
+            else:
+                etag_path.unlink(missing_ok=True)
+        except OSError as e:
+            logger.warning(f"Could not store data file ETag: {e}")
+
+    def _is_stale(self, path: Path) -> bool:
+        """Whether the cached file is older than the configured TTL."""
+        age = datetime.now().timestamp() - path.stat().st_mtime
+        return age > self._settings.data_cache_ttl_seconds
+
+    def _download(self, headers: dict) -> requests.Response:
+        """Request the Arrow file from the data source."""
         url = self._settings.data_source_url
         logger.info(f"Loading data from {url}")
-        
+
         try:
             response = self._session.get(
                 url,
+                headers=headers,
                 timeout=self._settings.request_timeout_seconds,
+                stream=True,
             )
             response.raise_for_status()
         except requests.exceptions.ConnectionError as e:
@@ -90,46 +284,56 @@ class DataRepository:
             ) from e
         except requests.exceptions.HTTPError as e:
             logger.error(f"HTTP error: {e}")
+            response.close()
             raise DataLoadError(
                 f"Data source returned an error (HTTP {response.status_code}). Please try again later."
             ) from e
         except requests.RequestException as e:
             logger.error(f"Request error: {e}")
             raise DataLoadError(f"Failed to load data: {e}") from e
+        return response
 
+    def _read_arrow(self, source: Union[Path, pa.Buffer]) -> pa.Table:
+        """Read the Arrow file or buffer, falling back to the IPC stream format."""
+        if isinstance(source, pa.Buffer):
+            try:
+                return feather.read_table(source)
+            except Exception:
+                return pa.ipc.open_stream(source).read_all()
         try:
-            df = self._read_arrow(BytesIO(response.content))
-        except Exception as e:
-            logger.error(f"Failed to parse Arrow data: {e}")
-            raise DataLoadError(
-                "Failed to parse data file. The data source may be corrupted."
-            ) from e
+            return feather.read_table(source, memory_map=True)
+        except Exception:
+            with pa.memory_map(str(source), "r") as mapped:
+                return pa.ipc.open_stream(mapped).read_all()
 
-        try:
-            self._validate_schema(df)
-        except ValueError as e:
-            logger.error(f"Schema validation failed: {e}")
-            raise DataValidationError(str(e)) from e
+    def _to_pandas(self, table: pa.Table) -> pd.DataFrame:
+        """Convert the loaded columns of an Arrow table to a dataframe.
 
-        self._coerce_types(df)
-        self._clean_data(df)
-        
-        logger.info(f"Successfully loaded {len(df)} records")
+        Columns outside ``LOADED_COLUMNS`` are dropped first, and Arrow builds
+        the categoricals directly from its string buffers, so unused and
+        object-dtype string columns are never materialised. Columns are kept
+        in separate blocks and Arrow buffers are released as they convert,
+        so the table and the frame are not both held in full.
+        """
+        table = table.select([c for c in table.column_names if c in self.LOADED_COLUMNS])
+        categories = [c for c in self.CATEGORICAL_COLUMNS if c in table.column_names]
+        df = table.to_pandas(categories=categories, split_blocks=True, self_destruct=True)
+        # Arrow orders categories by first appearance in the file; sort them so
+        # grouped output does not depend on how the source rows are ordered
+        for col in categories:
+            df[col] = df[col].cat.set_categories(sorted(df[col].cat.categories))
         return df
 
-    def _read_arrow(self, payload: BytesIO) -> pd.DataFrame:
-        """Read Arrow file with fallback to IPC stream."""
-        try:
-            payload.seek(0)
-            return pd.read_feather(payload)
-        except Exception:
-            payload.seek(0)
-            reader = pa.ipc.open_stream(payload)
-            return reader.read_all().to_pandas()
+    def _fingerprint(self, source: Union[Path, pa.Buffer]) -> str:
+        """Hash the raw bytes of the data file without copying them."""
+        if isinstance(source, pa.Buffer):
+            return hashlib.blake2b(source, digest_size=16).hexdigest()
+        with pa.memory_map(str(source), "r") as mapped:
+            return hashlib.blake2b(mapped.read_buffer(), digest_size=16).hexdigest()
 
-    def _validate_schema(self, df: pd.DataFrame) -> None:
+    def _validate_schema(self, columns: Sequence[str]) -> None:
         """Validate required columns exist."""
-        missing = [c for c in self.REQUIRED_COLUMNS if c not in df.columns]
+        missing = [c for c in self.REQUIRED_COLUMNS if c not in columns]
         if missing:
             raise ValueError(f"Missing required columns: {missing}")
 
@@ -139,17 +343,39 @@ class DataRepository:
         df["Ship Date"] = pd.to_datetime(df["Ship Date"], errors="coerce")
         for col in ["Sales", "Profit", "Quantity", "Discount"]:
             df[col] = pd.to_numeric(df[col], errors="coerce")
+        for col in self.CATEGORICAL_COLUMNS:
+            if col in df.columns:
+                df[col] = df[col].astype("category")
 
     def _clean_data(self, df: pd.DataFrame) -> None:
-        """Clean and validate data values."""
+        """Clean and validate data values.
+
+        Quantities and discounts are stored at 32 bits. Sales and profit
+        stay float64: totals run into the millions, beyond float32's seven
+        significant digits at cent precision.
+        """
         # Fill NaN values with defaults
         df["Sales"] = df["Sales"].fillna(0)
         df["Profit"] = df["Profit"].fillna(0)
-        df["Quantity"] = df["Quantity"].fillna(0)
-        df["Discount"] = df["Discount"].fillna(0)
+        df["Quantity"] = df["Quantity"].fillna(0).astype("int32")
+        df["Discount"] = df["Discount"].fillna(0).astype("float32")
         
         # Remove rows with invalid dates
         initial_count = len(df)
         df.dropna(subset=["Order Date"], inplace=True)
         if len(df) < initial_count:
             logger.warning(f"Dropped {initial_count - len(df)} rows with invalid dates")
+
+    def _add_derived_columns(self, df: pd.DataFrame) -> None:
+        """Precompute per-row keys the analytics would otherwise derive per request."""
+        df[MONTH_COLUMN] = order_months(df["Order Date"])
+
+    def _index_by_date(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Sort rows by order date and index them by it.
+
+        Date range filters then slice the frame by binary search instead of
+        comparing every row.
+        """
+        df = df.sort_values("Order Date", kind="stable")
+        df.index = pd.DatetimeIndex(df["Order Date"], name=ORDER_DATE_INDEX)
+        return df
@@ -0,0 +1,14 @@
+"""Shared thread pool for fanning out independent dashboard work."""
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+_CPUS = os.cpu_count() or 1
+
+# Sized for the six dashboard charts. Kept separate from the event loop's
+# executor, whose threads block waiting on these tasks. On single-core hosts
+# there is nothing to overlap, so callers run their work inline.
+DASHBOARD_POOL: Optional[ThreadPoolExecutor] = (
+    ThreadPoolExecutor(max_workers=min(6, _CPUS), thread_name_prefix="dashboard")
+    if _CPUS > 1 else None
+)
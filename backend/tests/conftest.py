@@ -1,25 +1,34 @@
 """Shared pytest fixtures."""
 import pytest
 from datetime import datetime
-from unittest.mock import patch, MagicMock
+from unittest.mock import MagicMock
 
 import pandas as pd
 from fastapi.testclient import TestClient
 
 from app.main import app
+from app.services.analytics import compute_filter_options
+from app.services.chart_service import ChartService
 from app.services.data_service import DataService
 from app.services.repository import DataRepository
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def client():
-    """Create a test client for the FastAPI application."""
+    """Create a test client for the FastAPI application, shared by all tests.
+
+    The client is not entered as a context manager, so the lifespan's data
+    preload never runs; tests supply services through dependency overrides.
+    """
     return TestClient(app)
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def sample_dataframe():
-    """Create a sample DataFrame for testing."""
+    """Create a sample DataFrame for testing.
+
+    Built once per session and shared, so tests must not modify it in place.
+    """
     return pd.DataFrame({
         "Row ID": [1, 2, 3, 4, 5],
         "Order ID": ["ORD-001", "ORD-001", "ORD-002", "ORD-003", "ORD-003"],
@@ -57,12 +66,25 @@ def sample_dataframe():
     })
 
 
+@pytest.fixture(scope="session")
+def expected_totals(sample_dataframe):
+    """Overview totals of the sample DataFrame, computed directly from its rows."""
+    return {
+        "sales": round(float(sample_dataframe["Sales"].sum()), 2),
+        "profit": round(float(sample_dataframe["Profit"].sum()), 2),
+        "orders": sample_dataframe["Order ID"].nunique(),
+        "customers": sample_dataframe["Customer ID"].nunique(),
+    }
+
+
 @pytest.fixture
 def mock_repository(sample_dataframe):
     """Create a mocked DataRepository with sample data."""
     mock_repo = MagicMock(spec=DataRepository)
     mock_repo.get_dataframe.return_value = sample_dataframe
+    mock_repo.get_filter_options.return_value = compute_filter_options(sample_dataframe)
     mock_repo.last_refresh = datetime.now()
+    mock_repo.data_version = "v1"
     return mock_repo
 
 
@@ -71,4 +93,11 @@ def mock_data_service(sample_dataframe, mock_repository):
     """Create a DataService with mocked repository."""
     service = DataService(repository=mock_repository)
     service._df = sample_dataframe
+    service._df_version = mock_repository.data_version
     return service
+
+
+@pytest.fixture
+def chart_service(mock_data_service):
+    """Create a ChartService backed by the mocked data service."""
+    return ChartService(mock_data_service)
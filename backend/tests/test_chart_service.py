@@ -1,16 +1,29 @@
 """Tests for the chart service."""
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
 import pytest
 
-from app.services.chart_service import ChartService
-from app.services.chart_styles import COLORS
+from app.services.chart_styles import COLORS, auto_currency_tickformat, axis_style
+
+# (DataService getter, ChartService builder) for every chart
+CHART_CASES = [
+    ("get_sales_by_category", "create_category_chart"),
+    ("get_sales_by_region", "create_region_chart"),
+    ("get_sales_trends", "create_trends_chart"),
+    ("get_profit_analysis", "create_profit_chart"),
+    ("get_segment_analysis", "create_segment_chart"),
+    ("get_state_sales", "create_choropleth_map"),
+]
 
 
 class TestChartServiceInit:
     """Tests for ChartService initialization."""
 
-    def test_chart_service_init(self, mock_data_service):
+    def test_chart_service_init(self, chart_service, mock_data_service):
         """Test that ChartService initializes correctly."""
-        chart_service = ChartService(mock_data_service)
         assert chart_service.data_service == mock_data_service
 
     def test_chart_colors_exist(self):
@@ -18,98 +31,84 @@ class TestChartServiceInit:
         assert len(COLORS) > 0
 
 
-class TestCategoryChart:
-    """Tests for create_category_chart method."""
+class TestTickFormat:
+    """Tests for auto_currency_tickformat."""
 
-    def test_category_chart_returns_dict(self, mock_data_service):
-        """Test that category chart returns a dictionary."""
-        chart_service = ChartService(mock_data_service)
-        data = mock_data_service.get_sales_by_category()
-        result = chart_service.create_category_chart(data)
-        assert isinstance(result, dict)
+    @pytest.mark.parametrize("values,expected", [
+        ([12.5, -40.0], "$,.2f"),
+        ([-25_000.0, 10.0], "$,.0f"),
+        ([2_500_000.0], "$,.2s"),
+        ([], "$,.2f"),
+    ])
+    def test_sequences_and_arrays_agree(self, values, expected):
+        """Test that lists, arrays and Series pick the same format."""
+        assert auto_currency_tickformat(values) == expected
+        assert auto_currency_tickformat(np.array(values, dtype=float)) == expected
+        assert auto_currency_tickformat(pd.Series(values, dtype=float)) == expected
 
-    def test_category_chart_has_data(self, mock_data_service):
-        """Test that category chart has data property."""
-        chart_service = ChartService(mock_data_service)
-        data = mock_data_service.get_sales_by_category()
-        result = chart_service.create_category_chart(data)
-        assert 'data' in result
+    def test_long_list_uses_same_thresholds(self):
+        """Test that long lists, scanned as arrays, keep the same result."""
+        values = [1.0] * 999 + [None, -1_500_000.0]
+        assert auto_currency_tickformat(values) == "$,.2s"
 
-    def test_category_chart_has_layout(self, mock_data_service):
-        """Test that category chart has layout property."""
-        chart_service = ChartService(mock_data_service)
-        data = mock_data_service.get_sales_by_category()
-        result = chart_service.create_category_chart(data)
-        assert 'layout' in result
+    def test_missing_values_ignored(self):
+        """Test that NaN in an array does not affect the format."""
+        assert auto_currency_tickformat(np.array([np.nan, 20_000.0])) == "$,.0f"
 
 
-class TestRegionChart:
-    """Tests for create_region_chart method."""
+class TestAxisStyle:
+    """Tests for axis_style."""
 
-    def test_region_chart_returns_dict(self, mock_data_service):
-        """Test that region chart returns a dictionary."""
-        chart_service = ChartService(mock_data_service)
-        data = mock_data_service.get_sales_by_region()
-        result = chart_service.create_region_chart(data)
-        assert isinstance(result, dict)
+    def test_extra_keys_merged(self):
+        """Test that extra keyword arguments are added to the axis."""
+        axis = axis_style("Month", showgrid=False, tickangle=-45)
+        assert axis["tickangle"] == -45
+        assert axis["showgrid"] is False
+        assert axis["title"]["text"] == "Month"
 
-    def test_region_chart_has_data(self, mock_data_service):
-        """Test that region chart has data property."""
-        chart_service = ChartService(mock_data_service)
-        data = mock_data_service.get_sales_by_region()
-        result = chart_service.create_region_chart(data)
-        assert 'data' in result
+    def test_extra_keys_override_defaults(self):
+        """Test that extra keyword arguments take precedence over the defaults."""
+        assert axis_style("", zeroline=True)["zeroline"] is True
 
 
-class TestTrendsChart:
-    """Tests for create_trends_chart method."""
+class TestChartBuilders:
+    """Tests for the per-chart create_* methods."""
 
-    def test_trends_chart_returns_dict(self, mock_data_service):
-        """Test that trends chart returns a dictionary."""
-        chart_service = ChartService(mock_data_service)
-        data = mock_data_service.get_sales_trends()
-        result = chart_service.create_trends_chart(data)
+    @pytest.mark.parametrize("method,builder", CHART_CASES[:-1])
+    def test_chart_has_data_and_layout(self, chart_service, mock_data_service, method, builder):
+        """Test that each chart is a dict with data and layout."""
+        data = getattr(mock_data_service, method)()
+        result = getattr(chart_service, builder)(data)
         assert isinstance(result, dict)
-
-    def test_trends_chart_has_data(self, mock_data_service):
-        """Test that trends chart has data property."""
-        chart_service = ChartService(mock_data_service)
-        data = mock_data_service.get_sales_trends()
-        result = chart_service.create_trends_chart(data)
         assert 'data' in result
+        assert 'layout' in result
 
+    def test_category_chart_uses_given_tickformat(self, chart_service, mock_data_service):
+        """Test that a precomputed tick format overrides the per-chart one."""
+        data = mock_data_service.get_sales_by_category()
+        result = chart_service.create_category_chart(data, y_fmt="$,.2s")
+        assert result['layout']['yaxis']['tickformat'] == "$,.2s"
 
-class TestProfitChart:
-    """Tests for create_profit_chart method."""
 
-    def test_profit_chart_returns_dict(self, mock_data_service):
-        """Test that profit chart returns a dictionary."""
-        chart_service = ChartService(mock_data_service)
-        data = mock_data_service.get_profit_analysis()
-        result = chart_service.create_profit_chart(data)
-        assert isinstance(result, dict)
-
-    def test_profit_chart_has_data(self, mock_data_service):
-        """Test that profit chart has data property."""
-        chart_service = ChartService(mock_data_service)
-        data = mock_data_service.get_profit_analysis()
-        result = chart_service.create_profit_chart(data)
-        assert 'data' in result
+class TestChartSchema:
+    """Tests that chart dicts are valid Plotly figures."""
 
+    @pytest.mark.parametrize("method,builder", CHART_CASES)
+    def test_chart_validates_as_figure(self, chart_service, mock_data_service, method, builder):
+        """Test that Plotly accepts the chart dict without validation errors."""
+        data = getattr(mock_data_service, method)()
+        chart = getattr(chart_service, builder)(data)
+        go.Figure(chart)
 
-class TestSegmentChart:
-    """Tests for create_segment_chart method."""
 
-    def test_segment_chart_returns_dict(self, mock_data_service):
-        """Test that segment chart returns a dictionary."""
-        chart_service = ChartService(mock_data_service)
-        data = mock_data_service.get_segment_analysis()
-        result = chart_service.create_segment_chart(data)
-        assert isinstance(result, dict)
+class TestBuildDashboard:
+    """Tests for build_dashboard method."""
 
-    def test_segment_chart_has_data(self, mock_data_service):
-        """Test that segment chart has data property."""
-        chart_service = ChartService(mock_data_service)
-        data = mock_data_service.get_segment_analysis()
-        result = chart_service.create_segment_chart(data)
-        assert 'data' in result
+    def test_parallel_build_matches_serial(self, chart_service, mock_data_service):
+        """Test that building charts on an executor gives the same charts."""
+        aggregates = mock_data_service.get_dashboard()
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            parallel = chart_service.build_dashboard(aggregates, executor)
+        serial = chart_service.build_dashboard(aggregates, None)
+        assert parallel == serial
+        assert set(serial) == {"category", "region", "trends", "profit", "segment", "states"}
@@ -1,9 +1,25 @@
 """Tests for the data service."""
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
 import pytest
-from unittest.mock import MagicMock
+from unittest.mock import patch
 
+from app.services import analytics
 from app.services.data_service import DataService
-from app.services.repository import DataRepository
+from app.services.filters import apply_filters
+
+
+# (DataService getter, fields every record has, number of groups in the sample)
+RECORD_CASES = [
+    ("get_sales_by_category", {'category', 'sales', 'profit', 'quantity', 'orders'}, 3),
+    ("get_sales_by_region", {'region', 'sales', 'profit', 'quantity', 'orders'}, 3),
+    ("get_sales_trends", {'month', 'sales', 'profit', 'orders'}, 3),
+    ("get_profit_analysis",
+     {'category', 'sub_category', 'sales', 'profit', 'quantity', 'profit_margin'}, 5),
+    ("get_segment_analysis", {'segment', 'sales', 'profit', 'customers', 'orders'}, 3),
+]
 
 
 class TestDataServiceInit:
@@ -20,6 +36,15 @@ class TestDataServiceInit:
         _ = service.df
         mock_repository.get_dataframe.assert_called_once()
 
+    def test_data_service_reloads_on_new_version(self, sample_dataframe, mock_repository):
+        """Test that a repository refresh replaces the frame and its aggregates."""
+        service = DataService(repository=mock_repository)
+        before = service.get_overview_metrics()
+        mock_repository.get_dataframe.return_value = sample_dataframe.head(2)
+        assert service.get_overview_metrics() == before
+        mock_repository.data_version = "v2"
+        assert service.get_overview_metrics()["total_sales"] == 550.0
+
 
 class TestOverviewMetrics:
     """Tests for get_overview_metrics method."""
@@ -32,127 +57,103 @@ class TestOverviewMetrics:
     def test_overview_has_required_fields(self, mock_data_service):
         """Test that overview has all required fields."""
         result = mock_data_service.get_overview_metrics()
-        required_fields = [
+        required_fields = {
             'total_sales', 'total_profit', 'total_orders',
             'total_customers', 'avg_order_value', 'profit_margin'
-        ]
-        for field in required_fields:
-            assert field in result
+        }
+        assert required_fields <= result.keys()
 
-    def test_overview_calculates_total_sales(self, mock_data_service):
+    def test_overview_calculates_total_sales(self, mock_data_service, expected_totals):
         """Test that total sales is calculated correctly."""
         result = mock_data_service.get_overview_metrics()
-        # 500 + 50 + 300 + 1000 + 25 = 1875
-        assert result['total_sales'] == 1875.0
+        assert result['total_sales'] == expected_totals['sales']
 
-    def test_overview_calculates_total_profit(self, mock_data_service):
+    def test_overview_calculates_total_profit(self, mock_data_service, expected_totals):
         """Test that total profit is calculated correctly."""
         result = mock_data_service.get_overview_metrics()
-        # 100 + 10 + (-20) + 200 + 5 = 295
-        assert result['total_profit'] == 295.0
+        assert result['total_profit'] == expected_totals['profit']
 
-    def test_overview_counts_unique_orders(self, mock_data_service):
+    def test_overview_counts_unique_orders(self, mock_data_service, expected_totals):
         """Test that order count is unique orders."""
         result = mock_data_service.get_overview_metrics()
-        # ORD-001, ORD-002, ORD-003 = 3 unique orders
-        assert result['total_orders'] == 3
+        assert result['total_orders'] == expected_totals['orders']
 
-    def test_overview_counts_unique_customers(self, mock_data_service):
+    def test_overview_counts_unique_customers(self, mock_data_service, expected_totals):
         """Test that customer count is unique customers."""
         result = mock_data_service.get_overview_metrics()
-        # CUST-001, CUST-002, CUST-003 = 3 unique customers
-        assert result['total_customers'] == 3
+        assert result['total_customers'] == expected_totals['customers']
+
+    def test_overview_counts_categorical_ids(self, mock_data_service, sample_dataframe):
+        """Test that distinct counts match when IDs are stored as categoricals."""
+        mock_data_service._df = sample_dataframe.astype(
+            {'Order ID': 'category', 'Customer ID': 'category'}
+        )
+        result = mock_data_service.get_overview_metrics(regions=["East", "West"])
+        assert result['total_orders'] == 2
+        assert result['total_customers'] == 2
+
+
+class TestRecordLists:
+    """Tests shared by the record-list getters."""
+
+    @pytest.mark.parametrize("method,required_fields,groups", RECORD_CASES)
+    def test_records_have_fields_per_group(
+        self, mock_data_service, method, required_fields, groups
+    ):
+        """Test that a getter returns one record per group with the required fields."""
+        result = getattr(mock_data_service, method)()
+        assert isinstance(result, list)
+        assert len(result) == groups
+        for record in result:
+            assert required_fields <= record.keys()
 
 
 class TestSalesByCategory:
     """Tests for get_sales_by_category method."""
 
-    def test_category_returns_list(self, mock_data_service):
-        """Test that category data returns a list."""
-        result = mock_data_service.get_sales_by_category()
-        assert isinstance(result, list)
-
-    def test_category_has_required_fields(self, mock_data_service):
-        """Test that each category record has required fields."""
-        result = mock_data_service.get_sales_by_category()
-        required_fields = ['category', 'sales', 'profit', 'quantity', 'orders']
-        for record in result:
-            for field in required_fields:
-                assert field in record
-
     def test_category_groups_correctly(self, mock_data_service):
         """Test that categories are grouped correctly."""
         result = mock_data_service.get_sales_by_category()
-        categories = [r['category'] for r in result]
-        # Technology, Office Supplies, Furniture
-        assert len(categories) == 3
-        assert 'Technology' in categories
-        assert 'Office Supplies' in categories
-        assert 'Furniture' in categories
-
-
-class TestSalesByRegion:
-    """Tests for get_sales_by_region method."""
+        categories = {r['category'] for r in result}
+        assert categories == {'Technology', 'Office Supplies', 'Furniture'}
 
-    def test_region_returns_list(self, mock_data_service):
-        """Test that region data returns a list."""
-        result = mock_data_service.get_sales_by_region()
-        assert isinstance(result, list)
-
-    def test_region_has_required_fields(self, mock_data_service):
-        """Test that each region record has required fields."""
-        result = mock_data_service.get_sales_by_region()
-        required_fields = ['region', 'sales', 'profit', 'quantity', 'orders']
-        for record in result:
-            for field in required_fields:
-                assert field in record
-
-    def test_region_groups_correctly(self, mock_data_service):
-        """Test that regions are grouped correctly."""
-        result = mock_data_service.get_sales_by_region()
-        regions = [r['region'] for r in result]
-        # East, West, Central
-        assert len(regions) == 3
+    def test_category_values_are_native(self, mock_data_service):
+        """Test that records hold plain Python values, not numpy scalars."""
+        record = mock_data_service.get_sales_by_category()[0]
+        assert type(record['category']) is str
+        assert type(record['sales']) is float
+        assert type(record['orders']) is int
 
 
 class TestSalesTrends:
     """Tests for get_sales_trends method."""
 
-    def test_trends_returns_list(self, mock_data_service):
-        """Test that trends data returns a list."""
-        result = mock_data_service.get_sales_trends()
-        assert isinstance(result, list)
-
-    def test_trends_has_required_fields(self, mock_data_service):
-        """Test that each trend record has required fields."""
-        result = mock_data_service.get_sales_trends()
-        required_fields = ['month', 'sales', 'profit', 'orders']
-        for record in result:
-            for field in required_fields:
-                assert field in record
-
     def test_trends_sorted_by_month(self, mock_data_service):
         """Test that trends are sorted by month."""
         result = mock_data_service.get_sales_trends()
         months = [r['month'] for r in result]
         assert months == sorted(months)
 
+    def test_trends_use_precomputed_months(self, sample_dataframe):
+        """Test that a loaded month column gives the same trends as the dates."""
+        with_months = sample_dataframe.assign(
+            **{analytics.MONTH_COLUMN: analytics.order_months(sample_dataframe["Order Date"])}
+        )
+        expected = analytics.compute_sales_trends(sample_dataframe)
+        assert analytics.compute_sales_trends(with_months) == expected
+        assert [r['month'] for r in expected] == ['2023-01', '2023-02', '2023-03']
 
-class TestProfitAnalysis:
-    """Tests for get_profit_analysis method."""
+    def test_order_months_labels(self):
+        """Test that months are labelled by calendar month, leaving missing dates unset."""
+        dates = pd.Series(pd.to_datetime(['2023-03-05', None, '2023-01-31']))
+        months = analytics.order_months(dates)
+        assert months.tolist()[::2] == ['2023-03', '2023-01']
+        assert pd.isna(months.iloc[1])
+        assert list(months.cat.categories) == ['2023-01', '2023-02', '2023-03']
 
-    def test_profit_returns_list(self, mock_data_service):
-        """Test that profit analysis returns a list."""
-        result = mock_data_service.get_profit_analysis()
-        assert isinstance(result, list)
 
-    def test_profit_has_required_fields(self, mock_data_service):
-        """Test that each profit record has required fields."""
-        result = mock_data_service.get_profit_analysis()
-        required_fields = ['category', 'sub_category', 'sales', 'profit', 'quantity', 'profit_margin']
-        for record in result:
-            for field in required_fields:
-                assert field in record
+class TestProfitAnalysis:
+    """Tests for get_profit_analysis method."""
 
     def test_profit_margin_calculated(self, mock_data_service):
         """Test that profit margin is calculated correctly."""
@@ -162,26 +163,147 @@ class TestProfitAnalysis:
                 expected_margin = round(record['profit'] / record['sales'] * 100, 2)
                 assert record['profit_margin'] == expected_margin
 
+    def test_profit_sorted_by_profit(self, mock_data_service):
+        """Test that records come back least profitable first."""
+        result = mock_data_service.get_profit_analysis()
+        profits = [r['profit'] for r in result]
+        assert profits == sorted(profits)
 
-class TestSegmentAnalysis:
-    """Tests for get_segment_analysis method."""
+    def test_profit_margin_zero_sales(self, mock_data_service, sample_dataframe):
+        """Test that a sub-category without sales has a zero margin."""
+        mock_data_service._df = sample_dataframe.assign(Sales=0.0)
+        result = mock_data_service.get_profit_analysis()
+        assert all(r['profit_margin'] == 0.0 for r in result)
+
+
+class TestCategoricalAggregation:
+    """Tests for aggregating by categorical keys through Arrow."""
+
+    CATEGORICALS = {
+        col: 'category'
+        for col in ('Region', 'Segment', 'Category', 'Sub-Category', 'State', 'Order ID', 'Customer ID')
+    }
+
+    def test_matches_object_keys(self, sample_dataframe):
+        """Test that categorical keys give the same records as string keys."""
+        categorical = sample_dataframe.astype(self.CATEGORICALS)
+        expected = analytics.compute_dashboard(sample_dataframe)
+        assert analytics.compute_dashboard(categorical) == expected
+
+    def test_sums_match_pandas_exactly(self):
+        """Test that rounded money totals match the pandas path to the cent."""
+        # With this seed, a naive re-ordered sum rounds one profit total a cent low
+        rng = np.random.default_rng(3)
+        size = 20_000
+        df = pd.DataFrame({
+            'Region': rng.choice(['Central', 'East', 'South', 'West'], size),
+            'Sales': rng.integers(1, 10_000_000, size) / 10_000,
+            'Profit': rng.integers(-1_000_000, 2_000_000, size) / 10_000,
+            'Quantity': rng.integers(1, 10, size),
+            'Order ID': rng.integers(0, 5_000, size).astype(str),
+        })
+        expected = analytics.compute_sales_by_region(df)
+        categorical = df.astype({'Region': 'category', 'Order ID': 'category'})
+        assert analytics.compute_sales_by_region(categorical) == expected
+
+    def test_missing_string_ids_counted_as_null(self, sample_dataframe):
+        """Test that NaN in a string ID column is skipped, not converted as a number."""
+        df = sample_dataframe.copy()
+        df.loc[0, 'Order ID'] = np.nan
+        expected = analytics.compute_sales_by_region(df)
+        categorical = df.astype({'Region': 'category'})
+        assert analytics.compute_sales_by_region(categorical) == expected
+
+    def test_missing_keys_dropped(self, sample_dataframe):
+        """Test that rows without a key are left out, as pandas does."""
+        categorical = sample_dataframe.astype(self.CATEGORICALS)
+        categorical.loc[0, 'Category'] = None
+        result = analytics.compute_sales_by_category(categorical)
+        assert sum(r['sales'] for r in result) == 1375.0
+        assert [r['category'] for r in result] == ['Furniture', 'Office Supplies', 'Technology']
+
+    def test_missing_ids_keep_rows(self, sample_dataframe):
+        """Test that a row with a missing ID still counts towards the sums."""
+        categorical = sample_dataframe.astype(self.CATEGORICALS)
+        categorical.loc[4, 'Customer ID'] = None
+        result = analytics.compute_segment_analysis(categorical)
+        home_office = next(r for r in result if r['segment'] == 'Home Office')
+        assert home_office['sales'] == 1025.0
+        assert home_office['customers'] == 1
+
+
+class TestDashboard:
+    """Tests for get_dashboard method."""
+
+    def test_dashboard_has_all_sections(self, mock_data_service):
+        """Test that the dashboard bundles every aggregate."""
+        result = mock_data_service.get_dashboard()
+        assert set(result) == {
+            'overview', 'category', 'region', 'segment', 'trends', 'profit', 'states'
+        }
+
+    def test_dashboard_filters_once(self, mock_data_service):
+        """Test that all dashboard aggregates share one filter pass."""
+        with patch(
+            "app.services.data_service.apply_filters", wraps=apply_filters
+        ) as spy:
+            result = mock_data_service.get_dashboard(regions=["East"])
+        spy.assert_called_once()
+        assert result['overview']['total_sales'] == 550.0
+
+    def test_dashboard_parallel_matches_serial(self, mock_data_service):
+        """Test that running the aggregates on an executor gives the same result."""
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            parallel = analytics.compute_dashboard(mock_data_service.df, executor)
+        assert parallel == analytics.compute_dashboard(mock_data_service.df)
+
+
+class TestStateSales:
+    """Tests for get_state_sales method."""
+
+    def test_state_sales_maps_state_codes(self, mock_data_service):
+        """Test that states are returned with their abbreviations."""
+        result = mock_data_service.get_state_sales()
+        codes = {r['state']: r['state_code'] for r in result}
+        assert codes == {'California': 'CA', 'Illinois': 'IL', 'New York': 'NY'}
+
+    def test_state_sales_drops_unknown_states(self, mock_data_service, sample_dataframe):
+        """Test that states without an abbreviation are skipped."""
+        df = sample_dataframe.copy()
+        df.loc[0, 'State'] = 'Atlantis'
+        mock_data_service._df = df
+        result = mock_data_service.get_state_sales()
+        assert 'Atlantis' not in [r['state'] for r in result]
+
+
+class TestFilteredViewCache:
+    """Tests for the shared filtered view."""
+
+    def test_same_filters_filter_once(self, mock_data_service):
+        """Test that analytics calls with equal filters share one filter pass."""
+        with patch(
+            "app.services.data_service.apply_filters", wraps=apply_filters
+        ) as spy:
+            mock_data_service.get_sales_by_category(regions=["East"])
+            mock_data_service.get_sales_by_region(regions=("East",))
+            mock_data_service.get_overview_metrics(regions=["West"])
+        assert spy.call_count == 2
+
+    def test_new_dataframe_invalidates_views(self, mock_data_service, sample_dataframe):
+        """Test that replacing the dataframe drops stale views."""
+        mock_data_service.get_overview_metrics()
+        mock_data_service._df = sample_dataframe.head(1)
+        result = mock_data_service.get_overview_metrics()
+        assert result['total_sales'] == 500.0
 
-    def test_segment_returns_list(self, mock_data_service):
-        """Test that segment analysis returns a list."""
-        result = mock_data_service.get_segment_analysis()
-        assert isinstance(result, list)
 
-    def test_segment_has_required_fields(self, mock_data_service):
-        """Test that each segment record has required fields."""
-        result = mock_data_service.get_segment_analysis()
-        required_fields = ['segment', 'sales', 'profit', 'customers', 'orders']
-        for record in result:
-            for field in required_fields:
-                assert field in record
-
-    def test_segment_groups_correctly(self, mock_data_service):
-        """Test that segments are grouped correctly."""
-        result = mock_data_service.get_segment_analysis()
-        segments = [r['segment'] for r in result]
-        # Consumer, Corporate, Home Office
-        assert len(segments) == 3
+class TestFilterOptions:
+    """Tests for compute_filter_options."""
+
+    def test_categorical_options_match_strings(self, sample_dataframe):
+        """Test that categorical columns list only the values present, sorted."""
+        expected = analytics.compute_filter_options(sample_dataframe)
+        categorical = sample_dataframe.astype({'Region': 'category', 'Segment': 'category'})
+        categorical['Region'] = categorical['Region'].cat.add_categories(['South'])
+        assert analytics.compute_filter_options(categorical) == expected
+        assert expected['regions'] == ['Central', 'East', 'West']
@@ -0,0 +1,72 @@
+"""Tests for the filtering utilities."""
+from datetime import date
+
+import pandas as pd
+
+import pytest
+
+from app.services.filters import ORDER_DATE_INDEX, SalesFilters, apply_filters
+
+
+class TestSalesFilters:
+    """Tests for SalesFilters canonicalisation."""
+
+    def test_from_query_parses_dates(self):
+        """Test that query dates are parsed once into date objects."""
+        filters = SalesFilters.from_query(start_date="2023-01-01", end_date="2023-02-28")
+        assert filters.start_date == date(2023, 1, 1)
+        assert filters.end_date == date(2023, 2, 28)
+
+    def test_from_query_ignores_list_order(self):
+        """Test that filter lists in any order produce equal filters."""
+        a = SalesFilters.from_query(regions=["West", "East"], segments=["Consumer"])
+        b = SalesFilters.from_query(regions=["East", "West", "East"], segments=["Consumer"])
+        assert a == b
+        assert hash(a) == hash(b)
+
+    def test_from_query_rejects_bad_date(self):
+        """Test that an unparseable date raises ValueError."""
+        with pytest.raises(ValueError):
+            SalesFilters.from_query(start_date="not-a-date")
+
+
+class TestApplyFilters:
+    """Tests for apply_filters."""
+
+    def test_no_filters_returns_source(self, sample_dataframe):
+        """Test that an unfiltered request does not copy the dataframe."""
+        assert apply_filters(sample_dataframe) is sample_dataframe
+
+    def test_filters_combine(self, sample_dataframe):
+        """Test that date and value filters are all applied."""
+        result = apply_filters(
+            sample_dataframe,
+            start_date=date(2023, 2, 1),
+            end_date="2023-03-31",
+            categories=["Technology"],
+        )
+        assert result["Product Name"].tolist() == ["Laptop"]
+
+    def test_categorical_columns_match_strings(self, sample_dataframe):
+        """Test that code-based matching selects the same rows as strings."""
+        categorical = sample_dataframe.astype({"Region": "category", "Category": "category"})
+        categorical.loc[0, "Region"] = None
+        for regions in (["East"], ["West", "Central", "Unknown"], ["Unknown"]):
+            expected = apply_filters(categorical.astype({"Region": object}), regions=regions)
+            result = apply_filters(categorical, regions=regions, categories=["Technology", "Furniture"])
+            expected = expected[expected["Category"].isin(["Technology", "Furniture"])]
+            assert result["Row ID"].tolist() == expected["Row ID"].tolist()
+
+    def test_matching_filters_return_source(self, sample_dataframe):
+        """Test that filters matching every row skip indexing."""
+        result = apply_filters(sample_dataframe, regions=["East", "West", "Central"])
+        assert result is sample_dataframe
+
+    def test_date_indexed_frame_matches_scan(self, sample_dataframe):
+        """Test that binary-searched date ranges select the same rows."""
+        indexed = sample_dataframe.copy()
+        indexed.index = pd.DatetimeIndex(indexed["Order Date"], name=ORDER_DATE_INDEX)
+        for start, end in [("2023-01-15", "2023-02-20"), (None, "2023-01-31"), ("2023-03-01", None)]:
+            expected = apply_filters(sample_dataframe, start_date=start, end_date=end)
+            result = apply_filters(indexed, start_date=start, end_date=end)
+            assert result["Row ID"].tolist() == expected["Row ID"].tolist()
@@ -1,8 +1,13 @@
 """Tests for the main FastAPI application."""
-import pytest
+import logging
+import queue
+from logging.handlers import QueueHandler
+from unittest.mock import patch
 from fastapi.testclient import TestClient
 
-from app.main import app
+from app.main import _DroppingQueueHandler, app
+from app.services.data_service import DataService
+from app.services.repository import DataLoadError
 
 
 class TestHealthEndpoint:
@@ -41,4 +46,46 @@ class TestCORSMiddleware:
             }
         )
         # OPTIONS requests should work with CORS
-        assert response.status_code in [200, 405]
+        assert response.status_code in (200, 405)
+
+
+class TestStartupPreload:
+    """Tests for loading data in the application lifespan."""
+
+    def test_startup_loads_dataframe(self, mock_repository):
+        """Test that the dataset is loaded before serving requests."""
+        service = DataService(repository=mock_repository)
+        with patch("app.main.get_data_service", return_value=service):
+            with TestClient(app):
+                mock_repository.get_dataframe.assert_called_once()
+
+    def test_startup_survives_load_error(self, mock_repository):
+        """Test that a failed preload does not prevent startup."""
+        mock_repository.get_dataframe.side_effect = DataLoadError("offline")
+        service = DataService(repository=mock_repository)
+        with patch("app.main.get_data_service", return_value=service):
+            with TestClient(app) as client:
+                assert client.get("/api/health").status_code == 200
+
+
+class TestQueuedLogging:
+    """Tests for the lifespan's queued logging."""
+
+    def test_handlers_installed_only_while_running(self, mock_repository):
+        """Test that importing the app leaves the root handlers alone."""
+        root = logging.getLogger()
+        before = root.handlers[:]
+        assert not any(isinstance(h, QueueHandler) for h in before)
+        service = DataService(repository=mock_repository)
+        with patch("app.main.get_data_service", return_value=service):
+            with TestClient(app):
+                assert [type(h) for h in root.handlers] == [_DroppingQueueHandler]
+        assert root.handlers == before
+
+    def test_full_queue_drops_records(self):
+        """Test that a full log queue drops records instead of raising."""
+        handler = _DroppingQueueHandler(queue.Queue(1))
+        record = logging.makeLogRecord({"msg": "x"})
+        handler.enqueue(record)
+        handler.enqueue(record)
+        assert handler.queue.qsize() == 1
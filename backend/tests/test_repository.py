@@ -0,0 +1,268 @@
+"""Tests for the data repository."""
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from unittest.mock import MagicMock
+
+import pandas as pd
+import pytest
+import requests
+
+from app.core.config import Settings
+from app.services.analytics import MONTH_COLUMN
+from app.services.data_service import DataService
+from app.services.filters import ORDER_DATE_INDEX
+from app.services.repository import DataLoadError, DataRepository, DataValidationError
+
+
+@pytest.fixture(scope="module")
+def arrow_bytes(sample_dataframe):
+    """Serialise the sample DataFrame as an Arrow (Feather v2) file."""
+    buffer = BytesIO()
+    sample_dataframe.to_feather(buffer)
+    return buffer.getvalue()
+
+
+@pytest.fixture
+def repository(tmp_path):
+    """Create a repository caching into a temporary directory."""
+    repo = DataRepository(settings=Settings(data_cache_dir=str(tmp_path)))
+    repo._session = MagicMock()
+    return repo
+
+
+def _response(status_code=200, content=b"", etag=None):
+    """Build a fake HTTP response."""
+    response = MagicMock()
+    response.status_code = status_code
+    response.iter_content.side_effect = lambda chunk_size: (
+        content[i:i + chunk_size] for i in range(0, len(content), chunk_size)
+    )
+    response.content = content
+    response.headers = {"ETag": etag} if etag else {}
+    return response
+
+
+def _broken_body(content):
+    """Yield part of a body, then fail as a dropped connection would."""
+    yield content[:100]
+    raise requests.exceptions.ChunkedEncodingError("Connection broken")
+
+
+class TestDiskCache:
+    """Tests for the on-disk Arrow cache."""
+
+    def test_first_load_downloads_and_caches(self, repository, arrow_bytes):
+        """Test that the first load downloads the file and stores it."""
+        repository._session.get.return_value = _response(content=arrow_bytes, etag='"v1"')
+        df = repository.get_dataframe()
+        assert len(df) == 5
+        path = repository._cache_path()
+        assert path.read_bytes() == arrow_bytes
+        assert path.with_name(path.name + ".etag").read_text() == '"v1"'
+
+    def test_download_streams_to_disk(self, repository, arrow_bytes):
+        """Test that the download is written in chunks, not buffered whole."""
+        repository.DOWNLOAD_CHUNK_SIZE = 1024
+        response = _response(content=arrow_bytes)
+        repository._session.get.return_value = response
+        assert len(repository.get_dataframe()) == 5
+        _, kwargs = repository._session.get.call_args
+        assert kwargs["stream"] is True
+        assert repository._cache_path().read_bytes() == arrow_bytes
+        response.close.assert_called_once()
+
+    def test_cached_file_skips_download(self, repository, arrow_bytes):
+        """Test that a new repository reuses the cached file."""
+        repository._cache_path().parent.mkdir(parents=True, exist_ok=True)
+        repository._cache_path().write_bytes(arrow_bytes)
+        df = repository.get_dataframe()
+        assert len(df) == 5
+        repository._session.get.assert_not_called()
+
+    def test_stale_cache_revalidates(self, repository, arrow_bytes):
+        """Test that a cached file older than the TTL is revalidated."""
+        path = repository._cache_path()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(arrow_bytes)
+        path.with_name(path.name + ".etag").write_text('"v1"')
+        old = time.time() - repository._settings.data_cache_ttl_seconds - 60
+        os.utime(path, (old, old))
+        repository._session.get.return_value = _response(status_code=304)
+        df = repository.get_dataframe()
+        assert len(df) == 5
+        _, kwargs = repository._session.get.call_args
+        assert kwargs["headers"] == {"If-None-Match": '"v1"'}
+        assert not repository._is_stale(path)
+
+    def test_refresh_sends_etag(self, repository, arrow_bytes):
+        """Test that a forced refresh revalidates with the stored ETag."""
+        repository._session.get.return_value = _response(content=arrow_bytes, etag='"v1"')
+        repository.get_dataframe()
+        repository._session.get.return_value = _response(status_code=304)
+        df = repository.get_dataframe(force_refresh=True)
+        assert len(df) == 5
+        _, kwargs = repository._session.get.call_args
+        assert kwargs["headers"] == {"If-None-Match": '"v1"'}
+
+    def test_data_version_hashes_content(self, tmp_path, arrow_bytes, sample_dataframe):
+        """Test that separate loads of the same file share a data version."""
+        buffer = BytesIO()
+        sample_dataframe.iloc[:4].to_feather(buffer)
+
+        def version_of(name, content):
+            repo = DataRepository(settings=Settings(data_cache_dir=str(tmp_path / name)))
+            repo._session = MagicMock()
+            repo._session.get.return_value = _response(content=content)
+            repo.get_dataframe()
+            return repo.data_version
+
+        assert version_of("a", arrow_bytes) == version_of("b", arrow_bytes)
+        assert version_of("c", buffer.getvalue()) != version_of("a", arrow_bytes)
+
+    def test_grouping_columns_are_categorical(self, repository, arrow_bytes):
+        """Test that low-cardinality grouping keys load as categoricals."""
+        repository._session.get.return_value = _response(content=arrow_bytes)
+        df = repository.get_dataframe()
+        for col in DataRepository.CATEGORICAL_COLUMNS:
+            assert isinstance(df[col].dtype, pd.CategoricalDtype)
+
+    def test_grouped_output_sorted_regardless_of_file_order(self, repository, arrow_bytes):
+        """Test that categories are sorted, not in order of first appearance."""
+        # The sample rows list regions East, West, Central
+        repository._session.get.return_value = _response(content=arrow_bytes)
+        df = repository.get_dataframe()
+        assert df["Region"].cat.categories.tolist() == ["Central", "East", "West"]
+        service = DataService(repository=repository)
+        regions = [r["region"] for r in service.get_sales_by_region()]
+        assert regions == ["Central", "East", "West"]
+        categories = [r["category"] for r in service.get_sales_by_category()]
+        assert categories == ["Furniture", "Office Supplies", "Technology"]
+
+    def test_unused_columns_not_loaded(self, repository, arrow_bytes):
+        """Test that only the columns the service reads are converted."""
+        repository._session.get.return_value = _response(content=arrow_bytes)
+        df = repository.get_dataframe()
+        assert "Product Name" not in df.columns
+        assert "Customer Name" not in df.columns
+        assert set(DataRepository.LOADED_COLUMNS) <= set(df.columns)
+
+    def test_missing_required_column_rejected(self, repository, sample_dataframe):
+        """Test that the schema is validated against the full file."""
+        buffer = BytesIO()
+        sample_dataframe.drop(columns=["Product Name"]).to_feather(buffer)
+        repository._session.get.return_value = _response(content=buffer.getvalue())
+        with pytest.raises(DataValidationError):
+            repository.get_dataframe()
+
+    def test_narrow_numeric_columns(self, repository, arrow_bytes):
+        """Test that quantity and discount are downcast and money stays float64."""
+        repository._session.get.return_value = _response(content=arrow_bytes)
+        df = repository.get_dataframe()
+        assert df["Quantity"].dtype == "int32"
+        assert df["Discount"].dtype == "float32"
+        assert df["Sales"].dtype == "float64"
+        assert df["Profit"].dtype == "float64"
+
+    def test_rows_indexed_by_order_date(self, repository, sample_dataframe):
+        """Test that loaded rows are sorted and indexed by order date."""
+        buffer = BytesIO()
+        sample_dataframe.iloc[::-1].reset_index(drop=True).to_feather(buffer)
+        repository._session.get.return_value = _response(content=buffer.getvalue())
+        df = repository.get_dataframe()
+        assert df.index.name == ORDER_DATE_INDEX
+        assert df.index.is_monotonic_increasing
+        assert (df.index == df["Order Date"]).all()
+        assert df[MONTH_COLUMN].tolist() == ["2023-01"] * 2 + ["2023-02"] + ["2023-03"] * 2
+
+    def test_filter_options_computed_per_load(self, repository, arrow_bytes):
+        """Test that filter options are cached until the data is reloaded."""
+        repository._session.get.return_value = _response(content=arrow_bytes)
+        options = repository.get_filter_options()
+        assert options["regions"] == ["Central", "East", "West"]
+        assert repository.get_filter_options() is options
+        repository._session.get.return_value = _response(status_code=304)
+        repository.get_dataframe(force_refresh=True)
+        assert repository.get_filter_options() is not options
+
+    def test_concurrent_loads_share_one_download(self, repository, arrow_bytes):
+        """Test that threads racing on a cold repository load the data once."""
+        repository._session.get.return_value = _response(content=arrow_bytes)
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            frames = list(pool.map(lambda _: repository.get_dataframe(), range(8)))
+        assert all(df is frames[0] for df in frames)
+        repository._session.get.assert_called_once()
+
+    def test_interrupted_download_raises(self, repository, arrow_bytes):
+        """Test that a body error mid-download fails the load and cleans up."""
+        response = _response(content=arrow_bytes)
+        response.iter_content.side_effect = lambda chunk_size: _broken_body(arrow_bytes)
+        repository._session.get.return_value = response
+        with pytest.raises(DataLoadError):
+            repository.get_dataframe()
+        assert list(repository._cache_path().parent.iterdir()) == []
+        response.close.assert_called_once()
+
+    def test_interrupted_revalidation_uses_cache(self, repository, arrow_bytes):
+        """Test that a body error on refresh falls back to the cached file."""
+        repository._session.get.return_value = _response(content=arrow_bytes, etag='"v1"')
+        repository.get_dataframe()
+        response = _response(content=arrow_bytes)
+        response.iter_content.side_effect = lambda chunk_size: _broken_body(arrow_bytes)
+        repository._session.get.return_value = response
+        df = repository.get_dataframe(force_refresh=True)
+        assert len(df) == 5
+        path = repository._cache_path()
+        assert path.read_bytes() == arrow_bytes
+        assert not list(path.parent.glob("*.tmp"))
+
+    def test_concurrent_writers_use_separate_temp_files(self, tmp_path, arrow_bytes):
+        """Test that a second process filling the cache mid-download does not clash."""
+        settings = Settings(data_cache_dir=str(tmp_path))
+        first, second = DataRepository(settings=settings), DataRepository(settings=settings)
+        for repo in (first, second):
+            repo._session = MagicMock()
+        second._session.get.return_value = _response(content=arrow_bytes)
+
+        def interleaved(chunk_size):
+            yield arrow_bytes[:100]
+            second.get_dataframe()
+            yield arrow_bytes[100:]
+
+        response = _response(content=arrow_bytes)
+        response.iter_content.side_effect = interleaved
+        first._session.get.return_value = response
+        assert len(first.get_dataframe()) == 5
+        assert first._cache_path().read_bytes() == arrow_bytes
+        assert not list(tmp_path.glob("*.tmp"))
+
+    def test_unreadable_cache_is_discarded(self, repository, arrow_bytes):
+        """Test that a corrupt cached file is removed instead of served until the TTL."""
+        path = repository._cache_path()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(b"not arrow")
+        repository._etag_path(path).write_text('"v1"')
+        with pytest.raises(DataLoadError):
+            repository.get_dataframe()
+        assert not path.exists()
+        assert not repository._etag_path(path).exists()
+        repository._session.get.return_value = _response(content=arrow_bytes)
+        assert len(repository.get_dataframe()) == 5
+
+    def test_unwritable_cache_dir_loads_in_memory(self, tmp_path, arrow_bytes):
+        """Test that a cache directory that cannot be created does not fail the load."""
+        blocker = tmp_path / "not-a-dir"
+        blocker.write_text("")
+        repository = DataRepository(settings=Settings(data_cache_dir=str(blocker / "cache")))
+        repository._session = MagicMock()
+        repository._session.get.return_value = _response(content=arrow_bytes, etag='"v1"')
+        df = repository.get_dataframe()
+        assert len(df) == 5
+        assert not repository._cache_path().exists()
+
+    def test_missing_cache_and_source_raises(self, repository):
+        """Test that a load with no cache and no source fails."""
+        repository._session.get.side_effect = requests.exceptions.ConnectionError()
+        with pytest.raises(DataLoadError):
+            repository.get_dataframe()
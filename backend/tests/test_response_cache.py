@@ -0,0 +1,59 @@
+"""Tests for the response cache."""
+from unittest.mock import MagicMock
+
+import orjson
+
+from app.core import response_cache
+from app.services.filters import SalesFilters
+
+
+class TestPayloads:
+    """Tests for the endpoint payload functions."""
+
+    def test_payloads_are_not_cached(self, mock_data_service):
+        """Test that payloads are rebuilt; only encoded bodies are cached."""
+        chart_service = MagicMock()
+        filters = SalesFilters()
+        payload = response_cache.PAYLOADS["by-category"]
+        first = payload(mock_data_service, chart_service, filters)
+        second = payload(mock_data_service, chart_service, filters)
+        assert first == second
+        assert chart_service.create_category_chart.call_count == 2
+
+    def test_different_filters_give_different_payloads(self, mock_data_service):
+        """Test that different filters compute separate responses."""
+        total = response_cache.overview(mock_data_service, MagicMock(), SalesFilters())
+        filtered = response_cache.overview(
+            mock_data_service, MagicMock(), SalesFilters(regions=("East",))
+        )
+        assert filtered["total_sales"] < total["total_sales"]
+
+
+class TestEncodedBodies:
+    """Tests for the cached JSON bodies."""
+
+    def test_body_reused_for_same_version(self, mock_data_service, expected_totals):
+        """Test that repeat requests share one encoded body."""
+        args = (response_cache.overview, mock_data_service, MagicMock(), SalesFilters())
+        first = response_cache.encoded("v1", *args)
+        assert response_cache.encoded("v1", *args) is first
+        assert orjson.loads(first)["total_sales"] == expected_totals["sales"]
+
+    def test_repeat_request_builds_payload_once(self, mock_data_service):
+        """Test that identical requests reuse the first body without rebuilding it."""
+        chart_service = MagicMock()
+        chart_service.create_category_chart.return_value = {}
+        payload = response_cache.PAYLOADS["by-category"]
+        args = (payload, mock_data_service, chart_service, SalesFilters())
+        first = response_cache.encoded("v1", *args)
+        assert response_cache.encoded("v1", *args) is first
+        chart_service.create_category_chart.assert_called_once()
+
+    def test_new_version_reencodes(self, mock_data_service):
+        """Test that a data refresh does not serve the previous body."""
+        chart_service = MagicMock()
+        chart_service.create_region_chart.return_value = {}
+        payload = response_cache.PAYLOADS["by-region"]
+        args = (payload, mock_data_service, chart_service, SalesFilters())
+        assert response_cache.encoded("v1", *args) is not response_cache.encoded("v2", *args)
+        assert chart_service.create_region_chart.call_count == 2
@@ -1,94 +1,227 @@
 """Tests for the sales API routes."""
+import json
+from datetime import datetime, timedelta
+
 import pytest
-from unittest.mock import patch
+from contextlib import contextmanager
+from unittest.mock import MagicMock
 
+from app.core import response_cache
+from app.main import app
+from app.services.chart_service import ChartService
 from app.services.data_service import DataService
 from app.core.dependencies import get_data_service, get_chart_service
+from app.services.repository import DataLoadError
+
+
+EMPTY_CHART = {"data": [], "layout": {}}
+
+
+@contextmanager
+def override(dependency, value):
+    """Temporarily swap a FastAPI dependency for the given value."""
+    previous = app.dependency_overrides.get(dependency)
+    app.dependency_overrides[dependency] = lambda: value
+    try:
+        yield value
+    finally:
+        if previous is None:
+            app.dependency_overrides.pop(dependency, None)
+        else:
+            app.dependency_overrides[dependency] = previous
+
+
+class StubChartService(ChartService):
+    """Chart service whose builders all return the same empty chart."""
+
+    def _empty_chart(self, data, *args, **kwargs):
+        return EMPTY_CHART
+
+    create_category_chart = create_region_chart = create_trends_chart = _empty_chart
+    create_profit_chart = create_segment_chart = create_choropleth_map = _empty_chart
+
+
+# Stateless, so one instance serves every test
+STUB_CHART_SERVICE = StubChartService(data_service=None)
+
+
+@pytest.fixture(autouse=True)
+def mock_services(mock_data_service):
+    """Serve every route test from the mock data and stub chart services."""
+    with override(get_data_service, mock_data_service):
+        with override(get_chart_service, STUB_CHART_SERVICE):
+            yield
 
 
 class TestSalesOverviewEndpoint:
     """Tests for the /api/sales/overview endpoint."""
 
-    def test_overview_returns_200(self, client, mock_data_service):
+    def test_overview_returns_200(self, client):
         """Test that overview endpoint returns 200."""
-        with patch("app.core.dependencies.get_data_service", return_value=mock_data_service):
-            response = client.get("/api/sales/overview")
-            assert response.status_code == 200
+        response = client.get("/api/sales/overview")
+        assert response.status_code == 200
 
-    def test_overview_returns_metrics(self, client, mock_data_service):
+    def test_overview_returns_metrics(self, client):
         """Test that overview returns metrics data."""
-        with patch("app.core.dependencies.get_data_service", return_value=mock_data_service):
-            response = client.get("/api/sales/overview")
-            data = response.json()
-            assert "total_sales" in data
-            assert "total_profit" in data
+        response = client.get("/api/sales/overview")
+        data = response.json()
+        assert "total_sales" in data
+        assert "total_profit" in data
 
 
 class TestSalesByCategoryEndpoint:
     """Tests for the /api/sales/by-category endpoint."""
 
-    def test_category_returns_200(self, client, mock_data_service):
+    def test_category_returns_200(self, client):
         """Test that category endpoint returns 200."""
-        with patch("app.core.dependencies.get_data_service", return_value=mock_data_service):
-            with patch("app.routers.sales.get_chart_service") as mock_chart:
-                mock_chart.return_value.create_category_chart.return_value = {"data": [], "layout": {}}
-                response = client.get("/api/sales/by-category")
-                assert response.status_code == 200
+        response = client.get("/api/sales/by-category")
+        assert response.status_code == 200
 
-    def test_category_returns_data_and_chart(self, client, mock_data_service):
+    def test_category_returns_data_and_chart(self, client):
         """Test that category returns both data and chart."""
-        with patch("app.core.dependencies.get_data_service", return_value=mock_data_service):
-            with patch("app.routers.sales.get_chart_service") as mock_chart:
-                mock_chart.return_value.create_category_chart.return_value = {"data": [], "layout": {}}
-                response = client.get("/api/sales/by-category")
-                data = response.json()
-                assert "data" in data
-                assert "chart" in data
+        response = client.get("/api/sales/by-category")
+        data = response.json()
+        assert data["columns"] == ["category", "sales", "profit", "quantity", "orders"]
+        assert len(data["rows"]) == 3
+        assert "chart" in data
 
 
 class TestSalesByRegionEndpoint:
     """Tests for the /api/sales/by-region endpoint."""
 
-    def test_region_returns_200(self, client, mock_data_service):
+    def test_region_returns_200(self, client):
         """Test that region endpoint returns 200."""
-        with patch("app.core.dependencies.get_data_service", return_value=mock_data_service):
-            with patch("app.routers.sales.get_chart_service") as mock_chart:
-                mock_chart.return_value.create_region_chart.return_value = {"data": [], "layout": {}}
-                response = client.get("/api/sales/by-region")
-                assert response.status_code == 200
+        response = client.get("/api/sales/by-region")
+        assert response.status_code == 200
 
 
 class TestSalesTrendsEndpoint:
     """Tests for the /api/sales/trends endpoint."""
 
-    def test_trends_returns_200(self, client, mock_data_service):
+    def test_trends_returns_200(self, client):
         """Test that trends endpoint returns 200."""
-        with patch("app.core.dependencies.get_data_service", return_value=mock_data_service):
-            with patch("app.routers.sales.get_chart_service") as mock_chart:
-                mock_chart.return_value.create_trends_chart.return_value = {"data": [], "layout": {}}
-                response = client.get("/api/sales/trends")
-                assert response.status_code == 200
+        response = client.get("/api/sales/trends")
+        assert response.status_code == 200
 
 
 class TestProfitAnalysisEndpoint:
     """Tests for the /api/sales/profit-analysis endpoint."""
 
-    def test_profit_returns_200(self, client, mock_data_service):
+    def test_profit_returns_200(self, client):
         """Test that profit analysis endpoint returns 200."""
-        with patch("app.core.dependencies.get_data_service", return_value=mock_data_service):
-            with patch("app.routers.sales.get_chart_service") as mock_chart:
-                mock_chart.return_value.create_profit_chart.return_value = {"data": [], "layout": {}}
-                response = client.get("/api/sales/profit-analysis")
-                assert response.status_code == 200
+        response = client.get("/api/sales/profit-analysis")
+        assert response.status_code == 200
 
 
 class TestSegmentAnalysisEndpoint:
     """Tests for the /api/sales/segment-analysis endpoint."""
 
-    def test_segment_returns_200(self, client, mock_data_service):
+    def test_segment_returns_200(self, client):
         """Test that segment analysis endpoint returns 200."""
-        with patch("app.core.dependencies.get_data_service", return_value=mock_data_service):
-            with patch("app.routers.sales.get_chart_service") as mock_chart:
-                mock_chart.return_value.create_segment_chart.return_value = {"data": [], "layout": {}}
-                response = client.get("/api/sales/segment-analysis")
-                assert response.status_code == 200
+        response = client.get("/api/sales/segment-analysis")
+        assert response.status_code == 200
+
+
+class TestPayloadRoutes:
+    """Tests for the routes generated from the payload table."""
+
+    @pytest.mark.parametrize("path", list(response_cache.PAYLOADS))
+    def test_every_payload_is_served(self, client, path):
+        """Test that each payload has a GET route with its description."""
+        assert client.get(f"/api/sales/{path}").status_code == 200
+        operation = app.openapi()["paths"][f"/api/sales/{path}"]["get"]
+        assert operation["description"] == response_cache.PAYLOADS[path].__doc__
+
+
+class TestDashboardEndpoint:
+    """Tests for the /api/sales/dashboard endpoint."""
+
+    def test_dashboard_returns_every_chart(self, client, chart_service, expected_totals):
+        """Test that the dashboard bundles the overview and all charts."""
+        with override(get_chart_service, chart_service):
+            response = client.get("/api/sales/dashboard")
+            assert response.status_code == 200
+            data = response.json()
+            assert data["overview"]["total_sales"] == expected_totals["sales"]
+            for name in ("category", "region", "trends", "profit", "segment", "states"):
+                assert set(data[name]) == {"columns", "rows", "chart"}
+
+    def test_dashboard_applies_filters(self, client, chart_service):
+        """Test that dashboard filters reach every section."""
+        with override(get_chart_service, chart_service):
+            response = client.get("/api/sales/dashboard?regions=East")
+            data = response.json()
+            assert data["overview"]["total_sales"] == 550.0
+            assert data["region"]["rows"] == [["East", 550.0, 110.0, 6, 1]]
+
+    def test_dashboard_stream_yields_ndjson_lines(self, client, chart_service, expected_totals):
+        """Test that the stream sends the overview first, then every chart."""
+        with override(get_chart_service, chart_service):
+            response = client.get("/api/sales/dashboard/stream")
+            assert response.status_code == 200
+            assert response.headers["content-type"] == "application/x-ndjson"
+            lines = [json.loads(line) for line in response.text.splitlines()]
+            assert lines[0]["key"] == "overview"
+            assert lines[0]["total_sales"] == expected_totals["sales"]
+            assert {line["key"] for line in lines[1:]} == set(ChartService.DASHBOARD_CHARTS)
+
+
+class TestServiceErrors:
+    """Tests for mapping service errors to HTTP responses."""
+
+    def test_data_load_error_returns_503(self, client):
+        """Test that an unavailable data source returns 503."""
+        service = MagicMock(spec=DataService)
+        service.get_overview_metrics.side_effect = DataLoadError("offline")
+        with override(get_data_service, service):
+            response = client.get("/api/sales/overview")
+            assert response.status_code == 503
+            assert response.json()["detail"]["code"] == "DATA_LOAD_ERROR"
+
+    def test_invalid_filter_returns_400(self, client):
+        """Test that an unparseable date filter returns 400."""
+        response = client.get("/api/sales/overview", params={"start_date": "not-a-date"})
+        assert response.status_code == 400
+        assert response.json()["detail"]["code"] == "INVALID_REQUEST"
+
+
+class TestHttpCaching:
+    """Tests for ETag and Cache-Control headers on sales endpoints."""
+
+    def test_response_has_cache_headers(self, client):
+        """Test that responses carry an ETag and Cache-Control."""
+        response = client.get("/api/sales/overview")
+        assert response.headers["etag"]
+        assert response.headers["cache-control"].startswith("public, max-age=")
+
+    def test_matching_etag_returns_304(self, client):
+        """Test that a current client copy is revalidated without a body."""
+        etag = client.get("/api/sales/overview").headers["etag"]
+        response = client.get("/api/sales/overview", headers={"If-None-Match": etag})
+        assert response.status_code == 304
+        assert response.content == b""
+        assert response.headers["etag"] == etag
+        assert response.headers["cache-control"].startswith("public, max-age=")
+
+    @pytest.mark.parametrize("header", ['W/{etag}', '"other", {etag}', '*'])
+    def test_weak_list_and_wildcard_validators_match(self, client, header):
+        """Test that If-None-Match uses weak comparison over a list of tags."""
+        etag = client.get("/api/sales/overview").headers["etag"]
+        response = client.get(
+            "/api/sales/overview", headers={"If-None-Match": header.format(etag=etag)}
+        )
+        assert response.status_code == 304
+
+    def test_etag_stable_across_reloads(self, client, mock_repository):
+        """Test that reloading unchanged data, as a restart does, keeps the ETag."""
+        first = client.get("/api/sales/overview").headers["etag"]
+        mock_repository.last_refresh = datetime.now() + timedelta(hours=1)
+        assert client.get("/api/sales/overview").headers["etag"] == first
+        mock_repository.data_version = "v2"
+        assert client.get("/api/sales/overview").headers["etag"] != first
+
+    def test_etag_varies_with_filters(self, client):
+        """Test that different filters produce different ETags."""
+        unfiltered = client.get("/api/sales/overview").headers["etag"]
+        filtered = client.get("/api/sales/overview", params={"regions": "East"}).headers["etag"]
+        assert unfiltered != filtered
@@ -55,11 +55,23 @@ export interface StateData {
   orders: number;
 }
 
+// Rows are value arrays ordered like `columns`; T describes one row's fields.
 export interface ChartResponse<T> {
-  data: T[] | T;
+  columns: Array<keyof T & string>;
+  rows: Array<Array<T[keyof T]>>;
   chart: PlotlyChart;
 }
 
+export interface DashboardResponse {
+  overview: OverviewMetrics;
+  category: ChartResponse<CategoryData>;
+  region: ChartResponse<RegionData>;
+  trends: ChartResponse<TrendData>;
+  profit: ChartResponse<ProfitData>;
+  segment: ChartResponse<SegmentData>;
+  states: ChartResponse<StateData>;
+}
+
 export interface PlotlyChart {
   data: any[];
   layout: any;